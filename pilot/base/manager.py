@@ -16,6 +16,29 @@ class BaseManager(ABC):
         self.log = Logger()
         self.section_name = None  # Para ser definido nas subclasses
         self.default_section = None  # Para ser definido nas subclasses
+        self.defaults = None  # Dict de valores padrão da seção (opcional)
+
+    @property
+    def settings(self):
+        """SectionView da seção do manager, mesclada sobre a seção padrão e `defaults`."""
+        return Config().section(self.section_name, self.default_section, self.defaults)
+
+    def init_section(self, defaults, **kwargs):
+        """
+        Registra a seção do manager para gravação no pilot.conf do projeto.
+
+        Grava só os valores passados explicitamente em `kwargs` e os defaults das
+        chaves que nenhuma camada define: valores vindos do pilot.conf do usuário
+        ou de variáveis PILOT_<SEÇÃO>__<CHAVE> não são copiados para o projeto.
+        """
+        if not self.config.has_section(self.section_name):
+            self.config.add_section(self.section_name)
+
+        for key, value in defaults.items():
+            if key in kwargs:
+                self.config.set(self.section_name, key, kwargs[key])
+            elif not self.config.has_option(self.section_name, key):
+                self.config.set(self.section_name, key, value)
 
     def _check_required_attributes(self):
         """Verifica se os atributos obrigatórios foram definidos nas subclasses."""
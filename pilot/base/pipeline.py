@@ -1,9 +1,12 @@
 # pilot\base\pipeline.py
+import os
 from abc import ABC, abstractmethod
 
-from pilot.src.context import Context
+from pilot.src.context import Context, active_tracer
 from pilot.src.config import Config
 from pilot.src.log import Logger
+from pilot.src.checkpoint import CheckpointStore
+from pilot.base.scheduler import Step, StepScheduler, PipelineError
 
 class BaseDeployPipeline:
     def __init__(self):
@@ -12,6 +15,10 @@ class BaseDeployPipeline:
         self.log = Logger()
         self.section_name = None  # Para ser definido nas subclasses
         self.default_section = None  # Para ser definido nas subclasses
+        self.defaults = None  # Dict de valores padrão da seção (opcional)
+        self.steps = []
+        self.scheduler = None
+        self.error = None  # PipelineError da última execução, se houver
 
     def _check_required_attributes(self):
         """Verifica se os atributos obrigatórios foram definidos nas subclasses."""
@@ -20,11 +27,67 @@ class BaseDeployPipeline:
         if not self.default_section:
             raise AttributeError(f"{self.__class__.__name__} deve definir 'default_section'")
 
+    @property
+    def settings(self):
+        """SectionView da seção do pipeline, mesclada sobre a seção padrão e `defaults`."""
+        return Config().section(self.section_name, self.default_section, self.defaults)
+
     def authenticate(self):
         # Implementação de autenticação comum a todos os pipelines, se necessário
         pass
-    
+
+    def add_step(self, name, func, inputs=(), outputs=(), **options):
+        """Declara uma etapa; a ordem de execução vem das entradas/saídas, não da declaração.
+
+        `options` são repassadas ao Step (`checkpoint`, `validate`, `volatile_inputs`).
+        """
+        self.steps.append(Step(name, func, inputs, outputs, **options))
+
+    def checkpoint_inputs(self):
+        """Entradas que identificam um deploy; mudá-las invalida os checkpoints salvos."""
+        sections = [self.section_name, self.default_section, 'publish', 'docker', 'aws']
+        return {
+            'pipeline': self.__class__.__name__,
+            'project': os.path.abspath(os.getcwd()),
+            'config': {
+                section: dict(self.config[section]) for section in sections
+                if section and self.config.has_section(section)
+            },
+        }
+
     @abstractmethod
-    def execute(self):
-        # Implementação de autenticação comum a todos os pipelines, se necessário
+    def define_steps(self):
+        """Declara as etapas do pipeline com `add_step`."""
         pass
+
+    def execute(self, resume=False):
+        """Executa as etapas pelo StepScheduler e loga o relatório de tempos.
+
+        As saídas das etapas com checkpoint são salvas em disco; com
+        `resume=True`, etapas já concluídas num deploy anterior que falhou são
+        puladas. Retorna os valores produzidos pelas etapas ou None em caso de falha.
+        """
+        self.steps = []
+        self.error = None
+        self.define_steps()
+        max_workers = self.settings.getint('max_workers', fallback=4)
+
+        checkpoints = CheckpointStore(self.checkpoint_inputs())
+        if not resume:
+            checkpoints.clear()
+
+        try:
+            self.scheduler = StepScheduler(
+                self.steps, max_workers=max_workers, tracer=active_tracer(),
+                span_args={'pipeline': self.__class__.__name__, 'section': self.section_name},
+            )
+            values = self.scheduler.run(checkpoints=checkpoints, resume=resume)
+            checkpoints.clear()  # Deploy concluído: nada a retomar
+            return values
+        except PipelineError as e:
+            self.error = e
+            self.log.error(f"Erro durante o pipeline {self.__class__.__name__} [{self.section_name}]: {e}")
+            return None
+        finally:
+            if self.scheduler:
+                self.log.info(f"Tempos por etapa:\n{self.scheduler.report()}")
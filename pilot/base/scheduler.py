@@ -0,0 +1,204 @@
+# pilot\base\scheduler.py
+import time
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from pilot.src.checkpoint import digest_values
+from pilot.src.context import active_tracer
+
+# Espera máxima (s) pelas etapas em andamento quando outra etapa falha
+SHUTDOWN_TIMEOUT = 60.0
+
+
+class PipelineError(Exception):
+    """Falha de uma etapa do pipeline (ou da definição do grafo de etapas)."""
+
+    def __init__(self, message, step_name=None):
+        super().__init__(message)
+        self.step_name = step_name
+
+
+class Step:
+    """
+    Etapa de pipeline com entradas e saídas explícitas.
+
+    `func` recebe as entradas como argumentos nomeados e retorna um dict com as
+    saídas declaradas (ou o valor direto, quando há uma única saída).
+
+    Com `checkpoint=True` as saídas são salvas ao final da etapa e podem ser
+    reaproveitadas num `--resume`, desde que as entradas (exceto as listadas em
+    `volatile_inputs`, como tokens) sejam as mesmas e `validate(**saídas)`,
+    se informado, confirme que elas ainda valem.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), checkpoint=False, validate=None, volatile_inputs=()):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.checkpoint = checkpoint
+        self.validate = validate
+        self.volatile_inputs = tuple(volatile_inputs)
+
+    def inputs_digest(self, values):
+        return digest_values({
+            key: values[key] for key in self.inputs if key not in self.volatile_inputs
+        })
+
+    def run(self, values):
+        result = self.func(**{key: values[key] for key in self.inputs})
+        if not self.outputs:
+            return {}
+        if len(self.outputs) == 1 and not isinstance(result, dict):
+            result = {self.outputs[0]: result}
+
+        missing = [key for key in self.outputs if key not in (result or {})]
+        if missing:
+            raise PipelineError(f"Etapa '{self.name}' não produziu: {', '.join(missing)}", self.name)
+        return {key: result[key] for key in self.outputs}
+
+
+class StepTiming:
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+        self.end = None
+        self.status = 'pendente'
+
+    @property
+    def duration(self):
+        if self.start is None or self.end is None:
+            return 0.0
+        return self.end - self.start
+
+
+class StepScheduler:
+    """
+    Executa as etapas assim que suas entradas estiverem disponíveis.
+
+    Etapas independentes rodam em paralelo (até `max_workers`). Na primeira
+    falha, nenhuma etapa nova é iniciada e um PipelineError é lançado.
+    Threads não podem ser interrompidas: as etapas já em andamento têm até
+    `shutdown_timeout` segundos para terminar antes do erro subir; depois
+    disso elas seguem rodando em segundo plano (status 'executando').
+    """
+
+    def __init__(self, steps, max_workers=4, tracer=None, span_args=None, shutdown_timeout=SHUTDOWN_TIMEOUT):
+        self.steps = list(steps)
+        self.max_workers = max(1, max_workers)
+        self.shutdown_timeout = shutdown_timeout
+        self.tracer = tracer or active_tracer()  # None: tracing desligado
+        self.span_args = span_args or {}
+        self.timings = {step.name: StepTiming(step.name) for step in self.steps}
+        self.origin = None
+        self._validate()
+
+    def _validate(self):
+        producers = {}
+        for step in self.steps:
+            for output in step.outputs:
+                if output in producers:
+                    raise PipelineError(f"Saída '{output}' produzida por '{producers[output]}' e '{step.name}'")
+                producers[output] = step.name
+        self.producers = producers
+
+    def _run_step(self, step, values):
+        timing = self.timings[step.name]
+        timing.start = time.perf_counter()
+        timing.status = 'executando'
+        try:
+            if self.tracer:
+                span = self.tracer.span(step.name, category='pipeline', **self.span_args)
+            else:
+                span = contextlib.nullcontext()
+            with span:
+                outputs = step.run(values)
+            timing.status = 'ok'
+            return outputs
+        except BaseException:
+            timing.status = 'erro'
+            raise
+        finally:
+            timing.end = time.perf_counter()
+
+    def _resume(self, step, values, checkpoints):
+        """Retorna as saídas salvas da etapa, se ela puder ser pulada."""
+        if not (checkpoints and step.checkpoint):
+            return None
+        outputs = checkpoints.get(step.name, step.inputs_digest(values))
+        if outputs is None:
+            return None
+        if step.validate and not step.validate(**outputs):
+            return None
+        return outputs
+
+    def run(self, initial_values=None, checkpoints=None, resume=False):
+        """Executa o grafo e retorna todos os valores produzidos.
+
+        Com `checkpoints` (um CheckpointStore), as saídas das etapas marcadas
+        são salvas; com `resume=True`, etapas já concluídas são puladas.
+        """
+        values = dict(initial_values or {})
+        missing = {
+            key for step in self.steps for key in step.inputs
+            if key not in values and key not in self.producers
+        }
+        if missing:
+            raise PipelineError(f"Entradas sem produtor: {', '.join(sorted(missing))}")
+
+        self.origin = time.perf_counter()
+        pending = list(self.steps)
+        running = {}
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while pending or running:
+                ready = [step for step in pending if all(key in values for key in step.inputs)]
+                resumed = False
+                for step in ready:
+                    pending.remove(step)
+                    outputs = self._resume(step, values, checkpoints) if resume else None
+                    if outputs is not None:
+                        self.timings[step.name].status = 'retomada'
+                        values.update(outputs)
+                        resumed = True
+                    else:
+                        running[executor.submit(self._run_step, step, dict(values))] = step
+
+                if resumed:
+                    continue  # Saídas retomadas podem liberar novas etapas
+                if not running:
+                    names = ', '.join(step.name for step in pending)
+                    raise PipelineError(f"Dependência circular entre as etapas: {names}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    try:
+                        outputs = future.result()
+                        if checkpoints and step.checkpoint:
+                            checkpoints.save(step.name, step.inputs_digest(values), outputs)
+                        values.update(outputs)
+                    except PipelineError:
+                        raise
+                    except Exception as e:
+                        raise PipelineError(f"Etapa '{step.name}' falhou: {e}", step.name) from e
+        finally:
+            for step in pending:
+                self.timings[step.name].status = 'cancelada'
+            if running:
+                wait(running, timeout=self.shutdown_timeout)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return values
+
+    def report(self):
+        """Relatório texto com início relativo, duração e status de cada etapa."""
+        lines = []
+        for step in self.steps:
+            timing = self.timings[step.name]
+            offset = (timing.start - self.origin) if timing.start and self.origin else 0.0
+            lines.append(f"  {step.name:<20} +{offset:6.2f}s  {timing.duration:7.2f}s  {timing.status}")
+        total = max((t.end for t in self.timings.values() if t.end), default=self.origin or 0) - (self.origin or 0)
+        lines.append(f"  {'total':<20} {'':8} {total:7.2f}s")
+        return '\n'.join(lines)
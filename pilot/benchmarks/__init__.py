@@ -0,0 +1 @@
+# pilot/benchmarks/__init__.py
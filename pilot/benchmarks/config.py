@@ -0,0 +1,93 @@
+# pilot/benchmarks/config.py
+"""
+Micro-benchmark das leituras de configuração.
+
+Compara a busca antiga do `Config.get` (inspeção de frames para achar
+`section_name`/`default_section` do chamador + `configparser.get`) com a
+leitura por SectionView.
+
+Uso:
+    python -m pilot.benchmarks.config [--lookups 100000] [--min-speedup 2]
+
+Sai com código 1 se a SectionView não for pelo menos `--min-speedup` vezes
+mais rápida que a busca antiga.
+"""
+import argparse
+import inspect
+import sys
+import timeit
+
+from pilot.src.config import SectionView, TrackedConfigParser
+
+SECTIONS = {
+    'deploy': {'pipeline_type': 'ecr', 'push_strategy': 'manifest', 'max_workers': '4'},
+    'default_deploy': {'docker_context': './docker', 'push_max_workers': '2'},
+}
+
+DEFAULT_LOOKUPS = 100_000
+DEFAULT_MIN_SPEEDUP = 2.0
+
+
+def legacy_get(parser, key):
+    """Reprodução da busca antiga do Config.get (frame do chamador + até 4 gets)."""
+    frame = inspect.currentframe()
+    try:
+        caller = frame.f_back.f_locals.get('self', None)
+        section_name = getattr(caller, 'section_name')
+        default_section = getattr(caller, 'default_section')
+        if section_name and parser.get(section_name, key):
+            return parser.get(section_name, key)
+        elif default_section and parser.get(default_section, key):
+            return parser.get(default_section, key)
+    finally:
+        del frame
+
+
+class _Manager:
+    """Chamador mínimo, com os atributos que a busca antiga procura no frame."""
+
+    section_name = 'deploy'
+    default_section = 'default_deploy'
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.view = SectionView(parser, self.section_name, self.default_section)
+
+    def legacy(self, key):
+        return legacy_get(self.parser, key)
+
+    def current(self, key):
+        return self.view.get(key)
+
+
+def run(lookups=DEFAULT_LOOKUPS, min_speedup=DEFAULT_MIN_SPEEDUP):
+    """Executa o benchmark e retorna True se a SectionView atingir o speedup mínimo."""
+    parser = TrackedConfigParser()
+    parser.read_dict(SECTIONS)
+    manager = _Manager(parser)
+    assert manager.legacy('push_strategy') == manager.current('push_strategy')
+
+    legacy = min(timeit.repeat(lambda: manager.legacy('push_strategy'), number=lookups, repeat=3))
+    current = min(timeit.repeat(lambda: manager.current('push_strategy'), number=lookups, repeat=3))
+    speedup = legacy / current
+
+    print(f"Config.get antigo: {legacy / lookups * 1e9:8.0f} ns por leitura")
+    print(f"SectionView.get:   {current / lookups * 1e9:8.0f} ns por leitura ({speedup:.1f}x)")
+
+    if speedup < min_speedup:
+        print(f"Regressão: speedup {speedup:.1f}x < mínimo de {min_speedup:.1f}x")
+        return False
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmark das leituras de configuração do pilot.")
+    parser.add_argument('--lookups', type=int, default=DEFAULT_LOOKUPS)
+    parser.add_argument('--min-speedup', type=float, default=DEFAULT_MIN_SPEEDUP)
+    args = parser.parse_args(argv)
+
+    return 0 if run(args.lookups, args.min_speedup) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
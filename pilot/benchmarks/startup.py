@@ -0,0 +1,94 @@
+# pilot/benchmarks/startup.py
+"""
+Benchmark de cold-start do CLI baseado em `python -X importtime`.
+
+Uso:
+    python -m pilot.benchmarks.startup [--max-ms 120] [--runs 5]
+
+Sai com código 1 se o tempo de import do entry point ultrapassar o limite
+ou se algum módulo pesado (managers, rich, invoke...) for importado no startup.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+ENTRY_POINT = 'pilot.__main__'
+
+# Módulos que não podem ser carregados só para montar o grupo do CLI
+FORBIDDEN_MODULES = (
+    'rich',
+    'invoke',
+    'pilot.docs',
+    'pilot.src.config',
+    'pilot.src.context',
+    'pilot.base.manager',
+)
+
+DEFAULT_MAX_MS = 120.0
+
+
+def measure_import(module=ENTRY_POINT):
+    """Importa o módulo num interpretador novo e retorna (cumulativo em ms, módulos importados)."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative_us = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # Cabeçalho
+        name = parts[2].strip()
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(parts[1])
+
+    if cumulative_us is None:
+        raise RuntimeError(f"Módulo '{module}' não apareceu na saída do -X importtime")
+
+    return cumulative_us / 1000, imported
+
+
+def run(runs=5, max_ms=DEFAULT_MAX_MS, module=ENTRY_POINT):
+    """Executa o benchmark e retorna True se o startup estiver dentro do orçamento."""
+    timings = []
+    imported = set()
+    for _ in range(runs):
+        elapsed_ms, imported = measure_import(module)
+        timings.append(elapsed_ms)
+
+    median_ms = statistics.median(timings)
+    print(f"{module}: mediana {median_ms:.1f} ms, mínimo {min(timings):.1f} ms ({runs} execuções)")
+
+    ok = True
+    leaked = sorted(name for name in imported if name.startswith(FORBIDDEN_MODULES))
+    if leaked:
+        print(f"Módulos pesados importados no startup: {', '.join(leaked)}")
+        ok = False
+
+    if median_ms > max_ms:
+        print(f"Regressão de startup: {median_ms:.1f} ms > limite de {max_ms:.1f} ms")
+        ok = False
+
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de cold-start do CLI do pilot.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=DEFAULT_MAX_MS)
+    parser.add_argument('--module', default=ENTRY_POINT)
+    args = parser.parse_args(argv)
+
+    return 0 if run(args.runs, args.max_ms, args.module) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# pilot/cli/__init__.py
+import importlib
+
+import click
+
+# Metadados estáticos dos subcomandos: nome -> (módulo, ajuda curta).
+# O `--help` e o shell completion são servidos daqui, sem importar nenhum manager.
+LAZY_COMMANDS = {
+    'doc': ('pilot.cli.doc', 'Exibe a documentação detalhada sobre: aws, docker, git, deploy, etc.'),
+    'init': ('pilot.cli.init', 'Inicializa o manager específico: aws, docker, git, vscode, etc.'),
+    'update': ('pilot.cli.update', 'Atualiza as configurações para o manager específico: vscode, etc.'),
+    'deploy': ('pilot.cli.deploy', 'Executa o processo de deploy configurado.'),
+    'publish': ('pilot.cli.publish', 'Executa o processo de publish configurado.'),
+    'clean': ('pilot.cli.clean', 'Remove artefatos de builds anteriores (dist, *.egg-info, etc.).'),
+    'commit': ('pilot.cli.commit', 'Executa o processo completo de commit, com ou sem append na mensagem.'),
+    'workspace': ('pilot.cli.workspace', 'Modo monorepo: lista, builda ou publica os pacotes afetados do repositório.'),
+}
+
+
+class LazyGroup(click.Group):
+    """
+    Grupo do Click que só importa o módulo de um subcomando quando ele é invocado.
+
+    Cada módulo em `lazy_commands` deve expor o comando no atributo `command`.
+    """
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            module_name, _ = self.lazy_commands[cmd_name]
+            command = importlib.import_module(module_name).command
+            self.add_command(command, cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        """Lista os subcomandos usando apenas os metadados estáticos."""
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.commands:
+                rows.append((name, self.commands[name].get_short_help_str()))
+            else:
+                rows.append((name, self.lazy_commands[name][1]))
+
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+    def shell_complete(self, ctx, incomplete):
+        """Completa nomes de subcomandos sem importar seus módulos."""
+        from click.shell_completion import CompletionItem
+
+        items = [
+            CompletionItem(name, help=help_text)
+            for name, (_, help_text) in self.lazy_commands.items()
+            if name.startswith(incomplete)
+        ]
+        items.extend(click.Command.shell_complete(self, ctx, incomplete))
+        return items
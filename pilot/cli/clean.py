@@ -0,0 +1,16 @@
+# pilot/cli/clean.py
+import os
+
+import click
+from pilot.src.build import BuildManager
+
+
+@click.command()
+@click.option('--dry-run', is_flag=True, help='Só lista os artefatos e o espaço que seria liberado.')
+@click.argument('project_path', default='.')
+def command(dry_run, project_path):
+    """Remove artefatos de builds anteriores (dist, *.egg-info, etc.)."""
+    manager = BuildManager()
+    count, total, elapsed = manager.remove_previous_build(os.path.abspath(project_path), dry_run=dry_run)
+    action = "seriam removidos" if dry_run else "removidos"
+    click.echo(f"{count} artefato(s) {action}, {total} bytes em {elapsed:.3f}s.")
@@ -0,0 +1,12 @@
+# pilot/cli/commit.py
+import click
+from pilot.src.git import GitManager
+
+
+@click.command()
+@click.option('-a', '--amend', is_flag=True, help='Faz append à mensagem de commit anterior.')
+@click.pass_context
+def command(ctx, amend):
+    """Executa o processo completo de commit, com ou sem append na mensagem."""
+    git_manager = GitManager()
+    git_manager.execute_commit(amend)
@@ -0,0 +1,14 @@
+# pilot/cli/deploy.py
+import click
+from pilot.src.deploy import DeployManager
+
+
+@click.command()
+@click.option('--resume', is_flag=True, help='Retoma o último deploy que falhou, pulando as etapas já concluídas.')
+@click.option('--target', 'targets', multiple=True, help='Alvo [deploy:<nome>] a executar (repetível; padrão: todos).')
+def command(resume, targets):
+    """Executa o processo de deploy configurado."""
+    manager = DeployManager()
+    results = manager.execute_deploy(resume=resume, targets=list(targets) or None)
+    if not results or not all(result.ok for result in results.values()):
+        raise SystemExit(1)
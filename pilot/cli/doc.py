@@ -0,0 +1,14 @@
+# pilot/cli/doc.py
+import click
+from pilot.docs import show_markdown, list_available_docs
+
+
+@click.command()
+@click.argument('doc_name', default='help')
+def command(doc_name):
+    """Exibe a documentação detalhada sobre: aws, docker, git, deploy, etc."""
+    if doc_name == 'help':
+        show_markdown('readme')
+        list_available_docs()
+    else:
+        show_markdown(doc_name)
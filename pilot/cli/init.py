@@ -0,0 +1,31 @@
+# pilot/cli/init.py
+import click
+from pilot.src.aws import AWSManager
+from pilot.src.docker import DockerManager
+from pilot.src.git import GitManager
+from pilot.src.vscode import VscodeManager
+
+
+@click.command()
+@click.argument('manager')
+@click.pass_context
+def command(ctx, manager):
+    """Inicializa o manager específico: aws, docker, git, vscode, etc."""
+    if manager == 'aws':
+        aws_manager = AWSManager()
+        aws_manager.init()
+        click.echo("AWS Manager inicializado.")
+    elif manager == 'docker':
+        docker_manager = DockerManager()
+        docker_manager.init()
+        click.echo("Docker Manager inicializado.")
+    elif manager == 'git':
+        git_manager = GitManager()
+        git_manager.init()
+        click.echo("Git Manager inicializado.")
+    elif manager == 'vscode':
+        vscode_manager = VscodeManager()
+        vscode_manager.init()
+        click.echo("Vscode Manager inicializado.")
+    else:
+        click.echo(f"Manager '{manager}' não reconhecido.")
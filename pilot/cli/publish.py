@@ -0,0 +1,12 @@
+# pilot/cli/publish.py
+import click
+from pilot.src.publish import PublishManager
+
+
+@click.command()
+@click.argument('project_path', default='.')
+def command(project_path):
+    """Executa o processo de publish configurado."""
+    manager = PublishManager(project_path)
+    if not manager.publish_package():
+        raise SystemExit(1)
@@ -0,0 +1,16 @@
+# pilot/cli/update.py
+import click
+from pilot.src.vscode import VscodeManager
+
+
+@click.command()
+@click.argument('manager')
+@click.pass_context
+def command(ctx, manager):
+    """Atualiza as configurações para o manager específico: vscode, etc."""
+    if manager == 'vscode':
+        vscode_manager = VscodeManager()
+        vscode_manager.update()
+        click.echo("Configurações do VS Code atualizadas.")
+    else:
+        click.echo(f"Manager '{manager}' não possui função de atualização.")
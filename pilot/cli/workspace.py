@@ -0,0 +1,24 @@
+# pilot/cli/workspace.py
+import click
+from pilot.src.workspace import WorkspaceManager
+
+
+@click.command()
+@click.argument('action', type=click.Choice(['list', 'build', 'publish']))
+@click.option('--since', 'base_ref', default=None, help='Referência do git diff (padrão: última tag de release).')
+@click.option('--all', 'all_packages', is_flag=True, help='Processa todos os pacotes, não só os afetados.')
+@click.option('--max-workers', type=int, default=None, help='Pacotes processados em paralelo.')
+def command(action, base_ref, all_packages, max_workers):
+    """Modo monorepo: lista, builda ou publica os pacotes afetados do repositório."""
+    manager = WorkspaceManager()
+    if action == 'list':
+        packages = manager.discover_packages()
+        affected = set(packages) if all_packages else manager.affected_packages(packages, base_ref)
+        for name, package in sorted(packages.items()):
+            marker = '*' if name in affected else ' '
+            click.echo(f"{marker} {name:<30} {package.relative_path}")
+        return
+
+    results = manager.run(action, base_ref=base_ref, all_packages=all_packages, max_workers=max_workers)
+    if not all(ok for ok, _, _ in results.values()):
+        raise SystemExit(1)
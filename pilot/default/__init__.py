@@ -0,0 +1,19 @@
+# pilot/default/__init__.py
+from pilot.default.aws import AWS_DEFAULTS
+from pilot.default.build import BUILD_DEFAULTS
+from pilot.default.context import CONTEXT_DEFAULTS
+from pilot.default.deploy import DEPLOY_DEFAULTS
+from pilot.default.git import GIT_DEFAULTS
+from pilot.default.publish import PUBLISH_DEFAULTS
+from pilot.default.workspace import WORKSPACE_DEFAULTS
+
+# Camada base da configuração: valores embutidos por seção do pilot.conf
+SECTION_DEFAULTS = {
+    'aws': AWS_DEFAULTS,
+    'build': BUILD_DEFAULTS,
+    'context': CONTEXT_DEFAULTS,
+    'deploy': DEPLOY_DEFAULTS,
+    'git': GIT_DEFAULTS,
+    'publish': PUBLISH_DEFAULTS,
+    'workspace': WORKSPACE_DEFAULTS,
+}
@@ -4,5 +4,7 @@ AWS_DEFAULTS = {
     'aws_account_id': '',
     'aws_default_region': '',
     'codeartifact_repository': '',
-    'codeartifact_domain': ''
+    'codeartifact_domain': '',
+    'codeartifact_token_duration': '43200',  # segundos (máximo permitido pela AWS: 12h)
+    'aws_backend': 'auto'  # 'sdk' (botocore em processo), 'cli' (aws CLI) ou 'auto'
 }
@@ -0,0 +1,10 @@
+# pilot\default\build.py
+
+BUILD_DEFAULTS = {
+    'build_roots': '.',  # diretórios (separados por vírgula) onde procurar artefatos de build
+    'artifacts': 'dist, *.egg-info, requirements.txt, setup.py',
+    'clean_max_depth': '2',  # 1 = só a raiz de build; 2 = também um nível abaixo (ex.: src/*.egg-info)
+    'clean_workers': '4',  # remoções executadas em paralelo
+    'cache': 'true',  # reaproveita artefatos de builds com o mesmo fingerprint
+    'cache_keep': '5'  # builds guardados no cache local
+}
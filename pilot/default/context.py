@@ -1,5 +1,8 @@
 
 
 CONTEXT_DEFAULTS = {
-    'verbosity': 'vv'
+    'verbosity': 'vv',
+    'max_concurrency': '8',  # comandos externos simultâneos no Context.arun
+    'command_timeout': '0',  # segundos por comando; 0 = sem limite
+    'stream_tail_lines': '200'  # linhas finais guardadas por stream no modo streaming
 }
\ No newline at end of file
@@ -7,5 +7,16 @@ DEPLOY_DEFAULTS = {
     'ecr_repo': 'my_ecr_repo',
     'task_definition': 'my_task_def',
     'cluster_name': 'my_cluster',
-    'service_name': 'my_service'
+    'service_name': 'my_service',
+    'push_strategy': 'parallel',  # 'parallel' (docker push concorrente) ou 'manifest' (tags criadas no registry)
+    'push_max_workers': '2',
+    'max_workers': '4',  # etapas do pipeline executadas em paralelo
+    'max_parallel_targets': '4',  # alvos [deploy:*] executados em paralelo
+    'allow_prereleases': 'false',  # considera versões .dev/rc/alpha/beta ao escolher a última versão
+    'allow_local': 'false',  # considera versões locais do setuptools_scm (ex.: 1.2.post3+dirty)
+    'version_status': 'Published',  # status das versões no CodeArtifact; vazio = qualquer status
+    'cache_from': '',  # cache de camadas do buildx (ex.: type=registry,ref=<repo>:buildcache); vazio = cache local
+    'cache_to': '',  # destino do cache do buildx (ex.: type=registry,ref=<repo>:buildcache,mode=max)
+    'buildx_builder': '',  # builder do buildx (--builder); vazio = 'pilot-<contexto>' (docker-container) com cache_to
+    'codeartifact_build_arg': 'false'  # também passa a URL como --build-arg (automático se o Dockerfile declara o ARG)
 }
\ No newline at end of file
@@ -0,0 +1,6 @@
+# pilot\default\git.py
+
+GIT_DEFAULTS = {
+    'change_threshold': '10',  # acima disso o `pilot commit` sugere commits menores
+    'fast_status': 'false'  # liga o untracked cache e o fsmonitor do git no status
+}
@@ -1,3 +1,10 @@
+# pilot\default\publish.py
+
 PUBLISH_DEFAULTS = {
-    'level': 'DEBUG'
-}
\ No newline at end of file
+    'level': 'DEBUG',
+    'repository_url': '',  # URL de upload (ex.: http://localhost:8080/); vazio = CodeArtifact da seção [aws]
+    'index_url': '',  # índice simple (PEP 503); vazio = <repository_url>/simple/
+    'username': '',  # vazio = 'aws' no CodeArtifact; a senha vem de TWINE_PASSWORD ou do token do CodeArtifact
+    'upload_workers': '4',  # arquivos enviados em paralelo
+    'index_cache_seconds': '300'  # validade da lista de arquivos já publicados
+}
@@ -0,0 +1,13 @@
+# pilot\default\vscode.py
+
+# Extensões instaladas pelo `pilot init vscode` (aceita `id@versão` para fixar a versão).
+# Podem ser substituídas pela opção 'extensions' da seção 'vscode', separadas por espaço.
+VSCODE_EXTENSIONS = [
+    "ms-python.python",
+    "ms-python.vscode-pylance",
+    "ms-python.debugpy",
+    "donjayamanne.python-environment-manager",
+    "njpwerner.autodocstring",
+    "gruntfuggly.todo-tree",
+    "yzhang.markdown-all-in-one"
+]
@@ -0,0 +1,7 @@
+# pilot\default\workspace.py
+
+WORKSPACE_DEFAULTS = {
+    'packages': '',  # globs (separados por vírgula) dos diretórios de pacotes; vazio = todo pyproject.toml do repositório
+    'base_ref': '',  # referência para o git diff; vazio = última tag de release (vMAJOR.MINOR.PATCH)
+    'max_workers': '4'  # pacotes processados em paralelo
+}
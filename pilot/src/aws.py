@@ -1,30 +1,50 @@
 # pilot\src\aws.py
+import io
 import os
-import json
-import subprocess
+import time
+import configparser
 
 from pilot.base.manager import BaseManager
 from pilot.default.aws import AWS_DEFAULTS
+from pilot.src.aws_backend import get_backend
+from pilot.src.cache import write_text_atomic
+from pilot.src.registry import RegistryClient
+from pilot.src.token_cache import TokenCache
+from pilot.src.versions import VersionIndex, excluded_versions, latest_version
+
+# Região usada quando `aws_default_region` não está configurada
+DEFAULT_REGION = 'us-east-1'
 
 class AWSManager(BaseManager):
 
-    def __init__(self):
+    def __init__(self, backend=None):
         super().__init__()
         self.section_name = 'aws'
+        self.defaults = AWS_DEFAULTS
+        self.token_cache = TokenCache()
+        self._backend = backend  # Injetável (ex.: `get_backend('sdk', ctx, clients=...)` em testes)
 
     def init(self, **kwargs):
         """
         Inicializa a sessão 'aws' no arquivo de configuração.
         """
-        if not self.config.has_section(self.section_name):
-            self.config.add_section(self.section_name)
-
         # Adiciona as configurações da AWS à sessão 'aws' usando os defaults
-        for key, default_value in AWS_DEFAULTS.items():
-            self.config.set(self.section_name, key, kwargs.get(key, default_value))
+        self.init_section(AWS_DEFAULTS, **kwargs)
 
         self.save_config()
 
+    @property
+    def backend(self):
+        """Backend de acesso à AWS (botocore em processo ou `aws` CLI), criado sob demanda."""
+        if self._backend is None:
+            name = self.settings.get('aws_backend')
+            self._backend = get_backend(name, self.ctx)
+        return self._backend
+
+    @property
+    def region(self):
+        return self.settings.get('aws_default_region') or DEFAULT_REGION
+
     def configure_aws(self):
         """
         Configura a AWS CLI se ainda não estiver configurada.
@@ -44,86 +64,58 @@ class AWSManager(BaseManager):
         Assume uma role na AWS e armazena as credenciais temporárias no CLI.
         """
         self.log.info(f"Assumindo a role: {role_arn}")
-        command = (
-            f"aws sts assume-role "
-            f"--role-arn {role_arn} "
-            f"--role-session-name {role_session_name}"
-        )
-        result = self.ctx.run(command)
-        if result: credentials = result.stdout.strip()
-        
-        if result and result.return_code == 0:
-            credentials = result.stdout.strip()
+        try:
+            credentials = self.backend.assume_role(role_arn, role_session_name, self.region)
             self.log.info("Role assumida com sucesso. Credenciais armazenadas.")
-        else:
-            self.log.warning(f"Falha ao assumir role: {result.stdout.strip() if result else 'No output'}")
+            return credentials
+        except Exception as e:
+            self.log.warning(f"Falha ao assumir role: {e}")
             return None
 
     # Relação com CodeArtifact
 
     def authenticate_twine(self):
         """
-        Configura o pip e o twine para usar o CodeArtifact com as credenciais da AWS.
+        Configura o twine para usar o CodeArtifact com as credenciais da AWS.
         """
         try:
-            codeartifact_url = self.get_codeartifact_url()
-            self.log.info(f"Autenticando twine com o CodeArtifact: {codeartifact_url}")
-
-            # Autenticar twine
-            self.ctx.run(
-                f"aws codeartifact login --tool twine "
-                f"--repository {self.config['aws']['codeartifact_repository']} "
-                f"--domain {self.config['aws']['codeartifact_domain']} "
-                f"--domain-owner {self.config['aws']['aws_account_id']} "
-                f"--region {self.config['aws']['aws_default_region']}"
-            )
-            
-            # Configurar pip.conf
-            self.update_pip_conf()
+            self.log.info(f"Autenticando twine com o CodeArtifact: {self.get_codeartifact_endpoint()}")
+
+            # Escreve o ~/.pypirc com o token em cache, sem chamar `aws codeartifact login`
+            self.update_pypirc()
 
             self.log.info("Autenticação configurada com sucesso.")
         except Exception as e:
-            self.log.error(f"Erro ao autenticar pip e twine: {e}")
+            self.log.error(f"Erro ao autenticar twine: {e}")
 
     def authenticate_pip(self):
         """
-        Configura o pip e o twine para usar o CodeArtifact com as credenciais da AWS.
+        Configura o pip para usar o CodeArtifact com as credenciais da AWS.
         """
         try:
-            codeartifact_url = self.get_codeartifact_url()
-            self.log.info(f"Autenticando pip com o CodeArtifact: {codeartifact_url}")
-
-            # Autenticar twine
-            self.ctx.run(
-                f"aws codeartifact login --tool twine "
-                f"--repository {self.config['aws']['codeartifact_repository']} "
-                f"--domain {self.config['aws']['codeartifact_domain']} "
-                f"--domain-owner {self.config['aws']['aws_account_id']} "
-                f"--region {self.config['aws']['aws_default_region']}"
-            )
-            
+            self.log.info(f"Autenticando pip com o CodeArtifact: {self.get_codeartifact_endpoint()}")
+
             # Configurar pip.conf
             self.update_pip_conf()
 
             self.log.info("Autenticação configurada com sucesso.")
         except Exception as e:
-            self.log.error(f"Erro ao autenticar pip e twine: {e}")
+            self.log.error(f"Erro ao autenticar pip: {e}")
 
     def update_pip_conf(self):
         self.log.info("Configurando pip.conf...")
         try:
-            token = self.get_codeartifact_token()
             pip_conf_path = os.path.expanduser('~/.config/pip/pip.conf')
 
             pip_conf_content = f"""
 [global]
 index-url = https://pypi.org/simple
-extra-index-url = https://aws:{token}@{self.config['aws']['codeartifact_domain']}-{self.config['aws']['aws_account_id']}.d.codeartifact.{self.config['aws']['aws_default_region']}.amazonaws.com/pypi/{self.config['aws']['codeartifact_repository']}/simple/
+extra-index-url = {self.get_codeartifact_url()}
 trusted-host =
     pypi.org
     pypi.python.org
     files.pythonhosted.org
-    {self.config['aws']['codeartifact_domain']}-{self.config['aws']['aws_account_id']}.d.codeartifact.{self.config['aws']['aws_default_region']}.amazonaws.com
+    {self.get_codeartifact_endpoint()}
 """
 
             with open(pip_conf_path, 'w') as pip_conf_file:
@@ -134,35 +126,68 @@ trusted-host =
         except Exception as e:
             self.log.error(f"Erro ao atualizar o pip.conf: {e}")
 
+    def update_pypirc(self):
+        """Escreve o repositório 'codeartifact' no ~/.pypirc, preservando os demais."""
+        self.log.info("Configurando .pypirc...")
+        pypirc_path = os.path.expanduser('~/.pypirc')
+
+        pypirc = configparser.ConfigParser()
+        pypirc.read(pypirc_path)
+
+        if not pypirc.has_section('distutils'):
+            pypirc.add_section('distutils')
+        servers = pypirc.get('distutils', 'index-servers', fallback='').split()
+        if 'codeartifact' not in servers:
+            servers.append('codeartifact')
+        pypirc.set('distutils', 'index-servers', '\n' + '\n'.join(servers))
+
+        if not pypirc.has_section('codeartifact'):
+            pypirc.add_section('codeartifact')
+        pypirc.set('codeartifact', 'repository', self.get_codeartifact_url(with_token=False).removesuffix('simple/'))
+        pypirc.set('codeartifact', 'username', 'aws')
+        pypirc.set('codeartifact', 'password', self.get_codeartifact_token())
+
+        # O arquivo guarda o token: 0600 também quando ele já existia com outra permissão
+        content = io.StringIO()
+        pypirc.write(content)
+        write_text_atomic(os.path.realpath(pypirc_path), content.getvalue(), mode=0o600)
+
+        self.log.info(f".pypirc atualizado com sucesso em {pypirc_path}")
+
     def get_codeartifact_token(self):
+        """Obtém o token do CodeArtifact, reaproveitando o cache enquanto ele for válido."""
+        aws = self.config['aws']
+        return self.token_cache.get(
+            aws['codeartifact_domain'],
+            aws['aws_account_id'],
+            self.region,
+            self._fetch_codeartifact_token,
+        )
+
+    def _fetch_codeartifact_token(self):
+        """Pede um novo token à AWS e retorna `(token, expiration)`."""
         self.log.info("Obtendo token no CodeArtfact...")
-        command = (
-            f"aws codeartifact get-authorization-token "
-            f"--domain {self.config['aws']['codeartifact_domain']} "
-            f"--domain-owner {self.config['aws']['aws_account_id']} "
-            f"--query authorizationToken "
-            f"--output text"
+        return self.backend.get_authorization_token(
+            self.config['aws']['codeartifact_domain'],
+            self.config['aws']['aws_account_id'],
+            self.region,
+            self.settings.get('codeartifact_token_duration'),
+        )
+
+    def get_codeartifact_endpoint(self):
+        """Retorna o host do domínio CodeArtifact configurado."""
+        return (
+            f"{self.config['aws']['codeartifact_domain']}-{self.config['aws']['aws_account_id']}.d.codeartifact."
+            f"{self.region}.amazonaws.com"
         )
-        result = self.ctx.run(command)
-        return result.stdout.strip()
 
-    def get_codeartifact_url(self):
+    def get_codeartifact_url(self, with_token=True):
         self.log.info("Montando URL do CodeArtifact...")
         try:
-            command = (
-                f"aws codeartifact get-authorization-token "
-                f"--domain {self.config['aws']['codeartifact_domain']} "
-                f"--domain-owner {self.config['aws']['aws_account_id']} "
-                f"--query authorizationToken "
-                f"--output text"
-            )
-            result = self.ctx.run(command)
-            codeartifact_token = result.stdout.strip()
+            credentials = f"aws:{self.get_codeartifact_token()}@" if with_token else ""
 
             return (
-                f"https://aws:{codeartifact_token}@"
-                f"{self.config['aws']['codeartifact_domain']}-{self.config['aws']['aws_account_id']}.d.codeartifact."
-                f"{self.config['aws']['aws_default_region']}.amazonaws.com/pypi/"
+                f"https://{credentials}{self.get_codeartifact_endpoint()}/pypi/"
                 f"{self.config['aws']['codeartifact_repository']}/simple/"
             )
 
@@ -172,44 +197,81 @@ trusted-host =
     def get_package_info(self, package_name):
         self.log.info("Obtendo a informações do pacote do CodeArtifact...")
         try:
-            command = (
-                f"aws codeartifact list-package-versions "
-                f"--domain {self.config['aws']['codeartifact_domain']} "
-                f"--domain-owner {self.config['aws']['aws_account_id']} "
-                f"--repository {self.config['aws']['codeartifact_repository']} "
-                f"--package {package_name} "
-                f"--format pypi "
-                f"--query versions"
+            package_info = self.backend.list_package_versions(
+                self.config['aws']['codeartifact_domain'],
+                self.config['aws']['aws_account_id'],
+                self.config['aws']['codeartifact_repository'],
+                package_name,
+                self.region,
             )
-            result = self.ctx.run(command)
-
-            package_info = json.loads(result.stdout)
             self.log.info(f"Informações do pacote {package_name} obtidas com sucesso.")
             return package_info
 
         except Exception as e:
             self.log.error(f"Erro ao obter informações do pacote {package_name}: {e}")
 
+    def get_latest_package_version(self, package_name, allow_prereleases=False, status='Published',
+                                   allow_local=False):
+        """
+        Última versão (PEP 440) do pacote no CodeArtifact, usando o índice local de versões.
+
+        Só as versões publicadas desde a última consulta são baixadas. Se nenhuma
+        versão passar pelos filtros, o log diz quais filtros descartaram o quê.
+        """
+        index = VersionIndex(
+            self.backend,
+            self.config['aws']['codeartifact_domain'],
+            self.config['aws']['aws_account_id'],
+            self.config['aws']['codeartifact_repository'],
+            package_name,
+            self.region,
+            status=status or None,
+        )
+        start = time.perf_counter()
+        versions, new_versions = index.refresh()
+        latest = latest_version(versions, allow_prereleases=allow_prereleases, allow_local=allow_local)
+        self.log.info(
+            f"Versões de {package_name}: {len(versions)} no índice ({len(new_versions)} nova(s)), "
+            f"resolvidas em {time.perf_counter() - start:.2f}s"
+        )
+        if latest is None:
+            if not versions:
+                self.log.warning(f"Nenhuma versão de {package_name} com status '{status or 'qualquer'}' no CodeArtifact.")
+            else:
+                excluded = excluded_versions(versions, allow_prereleases, allow_local)
+                summary = ', '.join(f"{count} {kind}" for kind, count in excluded.items() if count)
+                self.log.warning(
+                    f"Todas as {len(versions)} versões de {package_name} foram descartadas pelos filtros ({summary}). "
+                    f"Use allow_prereleases/allow_local na seção [deploy] para considerá-las."
+                )
+        return latest
+
     # Relação com ECR
 
     def get_ecr_authentication_token(self):
         """Obtém o token de autenticação para o ECR e executa o comando de login do Docker."""
         self.log.info("Obtendo token de autenticação no ECR...")
         try:
-            region = self.config['aws']['aws_default_region']
-            account_id = self.config['aws']['aws_account_id']
-            ecr_url = f"{account_id}.dkr.ecr.{region}.amazonaws.com"
-
-            # Comando para autenticar no ECR via Docker
-            command = (
-                f"aws ecr get-login-password --region {region} | "
-                f"docker login --username AWS --password-stdin {ecr_url}"
-            )
-            self.ctx.run(command)
+            ecr_url = self.get_ecr_registry()
+            password = self.backend.get_ecr_login_password(self.region)
+
+            # A senha vai pelo stdin, fora da linha de comando
+            result = self.ctx.run(f"docker login --username AWS --password-stdin {ecr_url}", input=password)
+            if not result.ok:
+                raise RuntimeError(result.stderr.strip())
             self.log.info("Autenticação no ECR realizada com sucesso.")
         except Exception as e:
             self.log.error(f"Erro ao obter token de autenticação no ECR: {e}")
 
+    def get_ecr_registry(self):
+        """Retorna o host do registry ECR da conta/região configuradas."""
+        return f"{self.config['aws']['aws_account_id']}.dkr.ecr.{self.region}.amazonaws.com"
+
+    def get_ecr_registry_client(self):
+        """Retorna um RegistryClient autenticado no registry ECR."""
+        password = self.backend.get_ecr_login_password(self.region)
+        return RegistryClient(self.get_ecr_registry(), username='AWS', password=password)
+
     def get_ecr_repository_url(self):
         """Monta a URL do repositório ECR, autenticando no ECR se necessário."""
         self.log.info("Montando URL do repositório ECR...")
@@ -217,12 +279,10 @@ trusted-host =
             # Invoca a autenticação no ECR antes de retornar a URL
             self.get_ecr_authentication_token()
 
-            region = self.config['aws']['aws_default_region']
-            account_id = self.config['aws']['aws_account_id']
             repository_name = self.config['deploy']['ecr_repo_name']
 
             # Monta a URL do repositório ECR
-            ecr_url = f"{account_id}.dkr.ecr.{region}.amazonaws.com/{repository_name}"
+            ecr_url = f"{self.get_ecr_registry()}/{repository_name}"
             self.log.info(f"URL do ECR montada: {ecr_url}")
             return ecr_url
         except Exception as e:
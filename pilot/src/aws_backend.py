@@ -0,0 +1,204 @@
+# pilot/src/aws_backend.py
+"""
+Backends de acesso à AWS usados pelo AWSManager.
+
+- `BotocoreBackend`: chama as APIs em processo, com clients do botocore mantidos
+  num pool durante toda a vida do processo (uma sessão, um client por serviço/região).
+- `CliBackend`: o caminho antigo, que executa o `aws` CLI via `Context.run`.
+
+O botocore é opcional: sem ele instalado, `get_backend('auto')` cai no CLI.
+Para testar offline, injete clients com `botocore.stub.Stubber` através do
+argumento `clients`, ou aponte para um moto server com `AWS_ENDPOINT_URL`.
+"""
+import json
+import base64
+import threading
+
+try:
+    import botocore.session
+    from botocore.config import Config as BotocoreConfig
+except ImportError:  # pragma: no cover - depende do ambiente
+    botocore = None
+
+_session = None
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def botocore_available():
+    return botocore is not None
+
+
+def get_pooled_client(service, region):
+    """Retorna o client do serviço/região, criando-o uma única vez por processo."""
+    global _session
+
+    key = (service, region)
+    with _clients_lock:
+        if key not in _clients:
+            if _session is None:
+                _session = botocore.session.get_session()
+            _clients[key] = _session.create_client(
+                service,
+                region_name=region or None,
+                config=BotocoreConfig(max_pool_connections=20, retries={'mode': 'standard'}),
+            )
+        return _clients[key]
+
+
+class CliBackend:
+    """Executa as chamadas através do `aws` CLI."""
+
+    name = 'cli'
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def _run_json(self, command):
+        result = self.ctx.run(f"{command} --output json")
+        if not result.ok:
+            raise RuntimeError(f"Falha ao executar '{command.split(' --')[0]}': {result.stderr.strip()}")
+        return json.loads(result.stdout)
+
+    def get_authorization_token(self, domain, owner, region, duration_seconds):
+        data = self._run_json(
+            f"aws codeartifact get-authorization-token "
+            f"--domain {domain} --domain-owner {owner} --region {region} "
+            f"--duration-seconds {duration_seconds}"
+        )
+        return data['authorizationToken'], data['expiration']
+
+    def list_package_versions(self, domain, owner, repository, package, region, package_format='pypi'):
+        return self._run_json(
+            f"aws codeartifact list-package-versions "
+            f"--domain {domain} --domain-owner {owner} --repository {repository} "
+            f"--package {package} --format {package_format} --region {region} "
+            f"--query versions"
+        )
+
+    def iter_package_versions(self, domain, owner, repository, package, region,
+                              package_format='pypi', status=None, page_size=100):
+        """Páginas de versões ordenadas pelo servidor por data de publicação (mais recentes primeiro)."""
+        token = None
+        while True:
+            command = (
+                f"aws codeartifact list-package-versions "
+                f"--domain {domain} --domain-owner {owner} --repository {repository} "
+                f"--package {package} --format {package_format} --region {region} "
+                f"--sort-by PUBLISHED_TIME --max-items {page_size}"
+            )
+            if status:
+                command += f" --status {status}"
+            if token:
+                command += f" --starting-token {token}"
+            data = self._run_json(command)
+            yield data.get('versions', [])
+            token = data.get('NextToken')
+            if not token:
+                return
+
+    def get_ecr_login_password(self, region):
+        result = self.ctx.run(f"aws ecr get-login-password --region {region}")
+        if not result.ok:
+            raise RuntimeError(f"Falha ao obter senha do ECR: {result.stderr.strip()}")
+        return result.stdout.strip()
+
+    def get_caller_identity(self, region):
+        return self._run_json(f"aws sts get-caller-identity --region {region}")
+
+    def assume_role(self, role_arn, role_session_name, region):
+        data = self._run_json(
+            f"aws sts assume-role --role-arn {role_arn} "
+            f"--role-session-name {role_session_name} --region {region}"
+        )
+        return data['Credentials']
+
+
+class BotocoreBackend:
+    """Executa as chamadas em processo com clients do botocore reaproveitados."""
+
+    name = 'sdk'
+
+    def __init__(self, clients=None, session=None):
+        # Clients injetados (ex.: com Stubber) têm precedência sobre o pool; com
+        # uma `session` própria, os clients saem dela em vez da sessão do processo
+        self.clients = dict(clients or {})
+        self.session = session
+        self._lock = threading.Lock()
+
+    def client(self, service, region):
+        if service in self.clients:
+            return self.clients[service]
+        if self.session is None:
+            return get_pooled_client(service, region)
+        with self._lock:
+            if service not in self.clients:
+                self.clients[service] = self.session.create_client(service, region_name=region or None)
+            return self.clients[service]
+
+    def get_authorization_token(self, domain, owner, region, duration_seconds):
+        response = self.client('codeartifact', region).get_authorization_token(
+            domain=domain, domainOwner=owner, durationSeconds=int(duration_seconds)
+        )
+        return response['authorizationToken'], response['expiration']
+
+    def list_package_versions(self, domain, owner, repository, package, region, package_format='pypi'):
+        paginator = self.client('codeartifact', region).get_paginator('list_package_versions')
+        versions = []
+        for page in paginator.paginate(
+            domain=domain, domainOwner=owner, repository=repository,
+            package=package, format=package_format
+        ):
+            versions.extend(page.get('versions', []))
+        return versions
+
+    def iter_package_versions(self, domain, owner, repository, package, region,
+                              package_format='pypi', status=None, page_size=100):
+        """Páginas de versões ordenadas pelo servidor por data de publicação (mais recentes primeiro)."""
+        client = self.client('codeartifact', region)
+        params = {
+            'domain': domain, 'domainOwner': owner, 'repository': repository,
+            'package': package, 'format': package_format,
+            'sortBy': 'PUBLISHED_TIME', 'maxResults': page_size,
+        }
+        if status:
+            params['status'] = status
+        while True:
+            response = client.list_package_versions(**params)
+            yield response.get('versions', [])
+            if not response.get('nextToken'):
+                return
+            params['nextToken'] = response['nextToken']
+
+    def get_ecr_login_password(self, region):
+        response = self.client('ecr', region).get_authorization_token()
+        token = response['authorizationData'][0]['authorizationToken']
+        # O token vem como base64 de "AWS:<senha>"
+        return base64.b64decode(token).decode('utf-8').split(':', 1)[1]
+
+    def get_caller_identity(self, region):
+        response = self.client('sts', region).get_caller_identity()
+        response.pop('ResponseMetadata', None)
+        return response
+
+    def assume_role(self, role_arn, role_session_name, region):
+        response = self.client('sts', region).assume_role(RoleArn=role_arn, RoleSessionName=role_session_name)
+        return response['Credentials']
+
+
+def get_backend(name, ctx, clients=None, session=None):
+    """
+    Seleciona o backend: 'sdk', 'cli' ou 'auto' (sdk se o botocore estiver instalado).
+
+    `clients` (por serviço, ex.: `{'ecr': client_com_stubber}`) e `session` são
+    repassados ao BotocoreBackend; informá-los implica o backend 'sdk'.
+    """
+    if clients or session:
+        return BotocoreBackend(clients, session)
+    if name == 'cli':
+        return CliBackend(ctx)
+    if name == 'sdk' and not botocore_available():
+        raise ImportError("O backend 'sdk' requer o pacote botocore instalado.")
+    if name in ('sdk', 'auto') and botocore_available():
+        return BotocoreBackend()
+    return CliBackend(ctx)
@@ -1,10 +1,21 @@
 # pilot/src/build.py
 import os
+import sys
+import time
+import fnmatch
 import shutil
-import subprocess
+import tomllib
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from pilot.base.manager import BaseManager
-from pilot.src.pyproject import PyprojectManager
+from pilot.default.build import BUILD_DEFAULTS
+from pilot.src.cache import get_cache_dir, read_json, write_json_atomic
+from pilot.src.digest import hash_files
+from pilot.src.lock import FileLock
+from pilot.src.project_index import IGNORED_DIRS, ProjectIndex
+
+# Entradas do cache sem manifest.json mais antigas que isso são lixo de gravações interrompidas
+INCOMPLETE_ENTRY_MAX_AGE = 24 * 3600
 
 class BuildManager(BaseManager):
 
@@ -12,46 +23,261 @@ class BuildManager(BaseManager):
         super().__init__()
         self.section_name = 'build'
         self.default_section = 'default_build'
+        self.defaults = BUILD_DEFAULTS
+        self.error = None  # Motivo da falha do último `build`, se houver
+
+    def init(self, **kwargs):
+        self.init_section(BUILD_DEFAULTS, **kwargs)
+
+        self.save_config()
+
+    def update(self, **kwargs):
+        raise NotImplementedError
 
-    def build(self, project_path='.'):
-        """Constrói o pacote do projeto."""
+    def build(self, project_path='.', use_cache=None):
+        """Constrói o pacote do projeto e retorna os caminhos dos artefatos em dist/.
+
+        Se um build com o mesmo fingerprint (fontes rastreados, pyproject.toml e
+        versão) já estiver no cache local, os artefatos são reaproveitados.
+        """
         project_path = os.path.abspath(project_path)
         self.log.info(f"Construindo projeto em: {project_path}")
+        if use_cache is None:
+            use_cache = self.settings.getboolean('cache')
+        self.error = None
 
         try:
+            fingerprint = self.build_fingerprint(project_path)
+            cached = self.cached_artifacts(fingerprint) if use_cache else None
+            self._record_cache_result(fingerprint, hit=cached is not None, enabled=use_cache)
+
             # Remover pastas de build do projeto
             self.remove_previous_build(project_path)
 
-            # Criação do requirements para injetar as dependências adequadas
-            # Função delegada para o PyprojectManager
-            pyproject_manager = PyprojectManager()
-            pyproject_manager.create_requirements_txt(project_path)
+            if cached is not None:
+                artifacts = self.restore_artifacts(cached, project_path)
+                self.log.info("Build reaproveitado do cache.")
+                return artifacts
 
             # Constrói o pacote
-            self.build_package(project_path)
+            if not self.build_package(project_path):
+                self.error = self.error or "python -m build falhou."
+                return []
 
+            artifacts = sorted(Path(project_path, 'dist').glob('*'))
+            if use_cache:
+                self.store_artifacts(fingerprint, artifacts)
             self.log.info(f"Build realizado com sucesso.")
+            return artifacts
         except Exception as e:
+            self.error = str(e)
             self.log.error(f"Erro durante o processo de build: {e}")
+            return []
+
+    def resolve_version(self, project_path):
+        """Versão que o build vai gerar: setuptools_scm, se disponível, ou `project.version`."""
+        try:
+            from setuptools_scm import get_version
+            return get_version(root=project_path)
+        except Exception:
+            pass
+        try:
+            with open(os.path.join(project_path, 'pyproject.toml'), 'rb') as f:
+                return tomllib.load(f).get('project', {}).get('version', '')
+        except (OSError, tomllib.TOMLDecodeError):
+            return ''
+
+    def build_fingerprint(self, project_path):
+        """
+        Fingerprint das entradas do build: arquivos rastreados do projeto (inclui o
+        pyproject.toml), a versão resolvida e o interpretador usado.
+
+        Artefatos de build (ex.: dist/, requirements.txt gerado) ficam de fora.
+        """
+        patterns = self.settings.getlist('artifacts')
+        index = ProjectIndex.for_root(project_path)
+        index.invalidate()  # O build pode vir depois de edições na mesma execução
+        sources = [
+            path for path in index.files
+            if not any(fnmatch.fnmatch(part, pattern) for part in path.split('/') for pattern in patterns)
+            # Só arquivos comuns: nada de removidos ainda não commitados nem submódulos
+            and os.path.isfile(os.path.join(project_path, path))
+        ]
+        version = self.resolve_version(project_path)
+        python = f"{sys.version_info.major}.{sys.version_info.minor}"
+        return hash_files(project_path, sources, extra=(version, python))
+
+    def _cache_entry(self, fingerprint):
+        """Diretório da entrada do cache; só é criado por `store_artifacts`."""
+        return get_cache_dir('builds') / fingerprint[:32]
+
+    def cached_artifacts(self, fingerprint):
+        """Artefatos guardados para o fingerprint, ou None se não houver um build completo."""
+        entry = self._cache_entry(fingerprint)
+        manifest = read_json(entry / 'manifest.json', default={})
+        if manifest.get('fingerprint') != fingerprint:
+            return None
+        files = [entry / name for name in manifest.get('files', [])]
+        if not files or not all(path.is_file() for path in files):
+            return None
+        return files
+
+    def restore_artifacts(self, cached_files, project_path):
+        dist = Path(project_path, 'dist')
+        dist.mkdir(parents=True, exist_ok=True)
+        artifacts = []
+        for cached in cached_files:
+            target = dist / cached.name
+            shutil.copy2(cached, target)
+            artifacts.append(target)
+            self.log.info(f"Artefato restaurado do cache: {target.name}")
+        return artifacts
 
-    def remove_previous_build(self, project_path):
-        """Remove artefatos antigos de build."""
+    def store_artifacts(self, fingerprint, artifacts):
+        """Copia os artefatos para o cache e remove as entradas mais antigas além de `cache_keep`."""
+        entry = self._cache_entry(fingerprint)
+        entry.mkdir(parents=True, exist_ok=True)
+        with FileLock(entry / '.lock'):
+            for artifact in artifacts:
+                shutil.copy2(artifact, entry / artifact.name)
+            # O manifesto é gravado por último: sem ele a entrada não é considerada
+            write_json_atomic(entry / 'manifest.json', {
+                'fingerprint': fingerprint,
+                'files': [artifact.name for artifact in artifacts],
+                'created_at': time.time(),
+            })
+        self._prune_cache(keep=self.settings.getint('cache_keep'))
+
+    def _prune_cache(self, keep):
+        entries = []
+        for path in get_cache_dir('builds').iterdir():
+            if not path.is_dir():
+                continue
+            if (path / 'manifest.json').exists():
+                entries.append(path)
+            elif time.time() - path.stat().st_mtime > INCOMPLETE_ENTRY_MAX_AGE:
+                shutil.rmtree(path, ignore_errors=True)  # Gravação interrompida (ou versão antiga do pilot)
+        entries.sort(key=lambda path: (path / 'manifest.json').stat().st_mtime, reverse=True)
+        for old_entry in entries[keep:]:
+            shutil.rmtree(old_entry, ignore_errors=True)
+
+    def _record_cache_result(self, fingerprint, hit, enabled=True):
+        """Atualiza e loga o placar de hits/misses do cache de build."""
+        if not enabled:
+            self.log.info("Cache de build desabilitado.")
+            return
+        stats_file = get_cache_dir('builds') / 'stats.json'
+        with FileLock(get_cache_dir('builds') / 'stats.lock'):
+            stats = read_json(stats_file, default={'hits': 0, 'misses': 0})
+            stats['hits' if hit else 'misses'] += 1
+            write_json_atomic(stats_file, stats)
+        result = 'HIT' if hit else 'MISS'
+        self.log.info(
+            f"Cache de build: {result} (fingerprint {fingerprint[:12]}; "
+            f"total de {stats['hits']} hit(s) e {stats['misses']} miss(es))"
+        )
+
+    def find_build_artifacts(self, project_path):
+        """
+        Localiza os artefatos de build numa única varredura das raízes configuradas.
+
+        Desce no máximo `clean_max_depth` níveis, não entra em virtualenvs,
+        .git, node_modules etc. nem dentro de um artefato já encontrado.
+        Diretórios (dist, *.egg-info) casam em qualquer nível; arquivos
+        (requirements.txt, setup.py) só na própria raiz de build.
+        """
+        patterns = self.settings.getlist('artifacts')
+        max_depth = self.settings.getint('clean_max_depth')
+        artifacts = []
+
+        for build_root in self.settings.getlist('build_roots'):
+            root = os.path.abspath(os.path.join(project_path, build_root))
+            if not os.path.isdir(root):
+                continue
+            stack = [(root, 1)]
+            while stack:
+                directory, depth = stack.pop()
+                try:
+                    entries = list(os.scandir(directory))
+                except OSError:
+                    continue
+                for entry in entries:
+                    matched = any(fnmatch.fnmatch(entry.name, pattern) for pattern in patterns)
+                    if matched and (depth == 1 or entry.is_dir(follow_symlinks=False)):
+                        artifacts.append(Path(entry.path))
+                    elif (
+                        depth < max_depth
+                        and entry.is_dir(follow_symlinks=False)
+                        and entry.name not in IGNORED_DIRS
+                        and not os.path.exists(os.path.join(entry.path, 'pyvenv.cfg'))
+                    ):
+                        stack.append((entry.path, depth + 1))
+
+        # Raízes sobrepostas (ex.: '.' e 'src') não podem gerar remoções duplicadas
+        return sorted(set(artifacts))
+
+    @staticmethod
+    def _path_size(path):
+        """Tamanho em bytes de um arquivo ou diretório (sem seguir links)."""
+        if not path.is_dir() or path.is_symlink():
+            return path.lstat().st_size
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.lstat(os.path.join(root, name)).st_size
+                except OSError:
+                    pass
+        return total
+
+    @classmethod
+    def _remove_path(cls, path):
+        size = cls._path_size(path)
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+        return size
+
+    def remove_previous_build(self, project_path, dry_run=False):
+        """Remove artefatos antigos de build e retorna (removidos, bytes, segundos).
+
+        Com `dry_run=True` só lista o que seria removido e quanto espaço seria liberado.
+        """
         self.log.info("Limpando artefatos de builds antigos...")
-        # Arquivos e pastas para remover
-        paths_to_remove = ['dist', '*.egg-info', 'requirements.txt', 'setup.py']
-        for path in paths_to_remove:
-            for file_or_dir in Path(project_path).rglob(path):
-                if os.path.exists(file_or_dir):
-                    if os.path.isdir(file_or_dir):
-                        shutil.rmtree(file_or_dir)
-                    else:
-                        os.remove(file_or_dir)
-                    self.log.info(f"Removido: {file_or_dir}")
+        start = time.perf_counter()
+        artifacts = self.find_build_artifacts(project_path)
+
+        if dry_run:
+            sizes = [self._path_size(path) for path in artifacts]
+            for path, size in zip(artifacts, sizes):
+                self.log.info(f"Seria removido: {path} ({size} bytes)")
+        else:
+            workers = max(1, self.settings.getint('clean_workers'))
+            sizes = []
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self._remove_path, path): path for path in artifacts}
+                for future, path in futures.items():
+                    try:
+                        sizes.append(future.result())
+                        self.log.info(f"Removido: {path}")
+                    except OSError as e:
+                        self.log.error(f"Erro ao remover {path}: {e}")
+
+        elapsed = time.perf_counter() - start
+        total = sum(sizes)
+        verb = "seriam liberados" if dry_run else "liberados"
+        self.log.info(f"{len(sizes)} artefato(s), {total} bytes {verb} em {elapsed:.3f}s")
+        return len(sizes), total, elapsed
 
     def build_package(self, project_path):
         """Realiza o processo de build do pacote."""
         self.log.info("Construindo o pacote...")
-        try:
-            subprocess.run([sys.executable, '-m', 'build', project_path], check=True)
-        except subprocess.CalledProcessError as e:
-            self.log.error(f"Erro ao construir o pacote: {str(e)}")
+        # Streaming: a saída do build aparece no terminal e as últimas linhas explicam a falha
+        result = self.ctx.run([sys.executable, '-m', 'build', project_path], stream=True)
+        if result.ok:
+            return True
+        output = [line for line in (result.stderr or result.stdout).splitlines() if line.strip()]
+        self.error = ' | '.join(output[-3:]) or f"python -m build retornou {result.return_code}"
+        self.log.error(f"Erro ao construir o pacote: {self.error}")
+        return False
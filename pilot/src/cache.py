@@ -0,0 +1,61 @@
+# pilot/src/cache.py
+import os
+import json
+import tempfile
+from pathlib import Path
+
+
+def get_cache_dir(*parts):
+    """
+    Retorna (e cria) o diretório de cache do pilot.
+
+    Respeita `PILOT_CACHE_DIR` e, depois, `XDG_CACHE_HOME`; por padrão usa `~/.cache/pilot`.
+    """
+    base = os.environ.get('PILOT_CACHE_DIR')
+    if not base:
+        base = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'pilot')
+
+    path = Path(base, *parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def read_json(path, default=None):
+    """Lê um JSON do cache, retornando `default` se ele não existir ou estiver corrompido."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_text_atomic(path, text, mode=None):
+    """Escreve um texto via arquivo temporário + `os.replace`, mantendo as permissões do arquivo atual."""
+    path = Path(path)
+    if mode is None:
+        mode = path.stat().st_mode & 0o777 if path.exists() else 0o644
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        os.chmod(tmp_path, mode)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json_atomic(path, content, mode=0o600):
+    """Escreve um JSON via arquivo temporário + `os.replace`, com as permissões indicadas."""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        os.chmod(tmp_path, mode)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(content, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
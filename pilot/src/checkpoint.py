@@ -0,0 +1,54 @@
+# pilot/src/checkpoint.py
+import json
+import time
+import hashlib
+
+from pilot.src.cache import get_cache_dir, read_json, write_json_atomic
+from pilot.src.lock import FileLock
+
+
+def digest_values(values):
+    """Digest estável de um dict de valores (usado para comparar entradas de etapas)."""
+    payload = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CheckpointStore:
+    """
+    Estado de um deploy salvo em disco, etapa a etapa.
+
+    O arquivo é chaveado pelas entradas do deploy (pipeline, projeto e
+    configurações relevantes), então uma mudança de configuração gera um
+    estado novo em vez de reaproveitar saídas antigas.
+    """
+
+    def __init__(self, deploy_inputs, cache_dir=None):
+        cache_dir = cache_dir or get_cache_dir('deploys')
+        self.key = digest_values(deploy_inputs)[:32]
+        self.state_file = cache_dir / f"{self.key}.json"
+        self.lock = FileLock(cache_dir / f"{self.key}.lock")
+
+    def load(self):
+        return read_json(self.state_file, default={}).get('steps', {})
+
+    def get(self, step_name, inputs_digest):
+        """Retorna as saídas salvas da etapa se ela concluiu com as mesmas entradas."""
+        entry = self.load().get(step_name)
+        if entry and entry.get('inputs_digest') == inputs_digest:
+            return entry['outputs']
+        return None
+
+    def save(self, step_name, inputs_digest, outputs):
+        with self.lock:
+            state = read_json(self.state_file, default={'steps': {}})
+            state['steps'][step_name] = {
+                'inputs_digest': inputs_digest,
+                'outputs': outputs,
+                'finished_at': time.time(),
+            }
+            write_json_atomic(self.state_file, state)
+
+    def clear(self):
+        with self.lock:
+            if self.state_file.exists():
+                self.state_file.unlink()
@@ -1,78 +1,369 @@
 # pilot\src\config.py
+import io
 import os
-import inspect
+import atexit
+import hashlib
 import configparser
 import sys
+import threading
 
 from pilot.singleton import Singleton
+from pilot.default import SECTION_DEFAULTS
 from pilot.src.log import Logger
+from pilot.src.cache import get_cache_dir, read_json, write_json_atomic, write_text_atomic
+from pilot.src.lock import FileLock
+
+_UNSET = object()
+_BOOLEAN_STATES = configparser.ConfigParser.BOOLEAN_STATES
+
+CONFIG_FILENAME = 'pilot.conf'
+# Variáveis PILOT_<SEÇÃO>__<CHAVE> sobrescrevem o pilot.conf (ex.: PILOT_DEPLOY__MAX_WORKERS=8)
+ENV_PREFIX = 'PILOT_'
+ENV_SEPARATOR = '__'
+CACHE_FORMAT = 1
+
+
+class TrackedConfigParser(configparser.ConfigParser):
+    """
+    ConfigParser que registra as alterações feitas em memória.
+
+    `generation` avisa as SectionViews quando recalcular; `changes` guarda as
+    operações (set, add/remove) desde o último flush, para reaplicá-las sobre
+    a versão do arquivo em disco.
+    """
+
+    def __init__(self, *args, **kwargs):
+        # Sem interpolação, como em `compile_layers` e `flush`: '%' é literal (URLs codificadas, senhas...)
+        kwargs.setdefault('interpolation', None)
+        self.generation = 0
+        self.changes = []
+        self._loading = True  # Leituras não são alterações
+        super().__init__(*args, **kwargs)
+        self._loading = False
+
+    def _changed(self, *operation):
+        self.generation += 1
+        if not self._loading:
+            self.changes.append(operation)
+
+    def read(self, *args, **kwargs):
+        result = super().read(*args, **kwargs)
+        self.generation += 1
+        return result
+
+    def read_file(self, *args, **kwargs):
+        super().read_file(*args, **kwargs)
+        self.generation += 1
+
+    def read_dict(self, *args, **kwargs):
+        loading, self._loading = self._loading, True
+        try:
+            super().read_dict(*args, **kwargs)
+        finally:
+            self._loading = loading
+
+    def set(self, section, option, value=None):
+        super().set(section, option, value)
+        self._changed('set', section, self.optionxform(option), value)
+
+    def add_section(self, section):
+        super().add_section(section)
+        self._changed('add_section', section)
+
+    def remove_option(self, section, option):
+        existed = super().remove_option(section, option)
+        self._changed('remove_option', section, self.optionxform(option))
+        return existed
+
+    def remove_section(self, section):
+        existed = super().remove_section(section)
+        self._changed('remove_section', section)
+        return existed
+
+
+def apply_changes(parser, changes):
+    """Reaplica as operações registradas sobre outro parser (ex.: o pilot.conf atual em disco)."""
+    for operation, section, *args in changes:
+        if operation in ('add_section', 'set') and not parser.has_section(section):
+            parser.add_section(section)
+        if operation == 'set':
+            option, value = args
+            parser.set(section, option, value)
+        elif operation == 'remove_option' and parser.has_section(section):
+            parser.remove_option(section, args[0])
+        elif operation == 'remove_section':
+            parser.remove_section(section)
+
+
+def user_config_file():
+    """pilot.conf do usuário: `PILOT_USER_CONFIG` ou `$XDG_CONFIG_HOME/pilot/pilot.conf`."""
+    path = os.environ.get('PILOT_USER_CONFIG')
+    if not path:
+        base = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+        path = os.path.join(base, 'pilot', CONFIG_FILENAME)
+    return os.path.abspath(path)
+
+
+def find_project_config(start):
+    """
+    Procura o pilot.conf subindo de `start` até a raiz do repositório git.
+
+    Retorna `(arquivo ou None, caminhos consultados)`; os caminhos consultados
+    são os que invalidam o cache se um pilot.conf aparecer ou sumir neles.
+    """
+    candidates = []
+    directory = os.path.abspath(start)
+    while True:
+        candidate = os.path.join(directory, CONFIG_FILENAME)
+        candidates.append(candidate)
+        if os.path.isfile(candidate):
+            return candidate, candidates
+        parent = os.path.dirname(directory)
+        if parent == directory or os.path.exists(os.path.join(directory, '.git')):
+            return None, candidates
+        directory = parent
+
+
+def stat_signature(path):
+    """(mtime_ns, tamanho) do arquivo, ou None se ele não existir."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def compile_layers(paths):
+    """Mescla os arquivos (do menos para o mais prioritário) num dict {seção: {chave: valor bruto}}."""
+    merged = configparser.ConfigParser(interpolation=None)
+    for path in paths:
+        if path and os.path.isfile(path):
+            merged.read(path, encoding='utf-8')
+    return {section: dict(merged.items(section, raw=True)) for section in merged.sections()}
+
+
+def environment_layer(environ=None):
+    """Valores das variáveis PILOT_<SEÇÃO>__<CHAVE>."""
+    sections = {}
+    for name, value in (os.environ if environ is None else environ).items():
+        if not name.startswith(ENV_PREFIX) or ENV_SEPARATOR not in name:
+            continue
+        section, _, key = name[len(ENV_PREFIX):].partition(ENV_SEPARATOR)
+        if section and key:
+            sections.setdefault(section.lower(), {})[key.lower()] = value
+    return sections
+
+
+class SectionView:
+    """
+    Visão de uma seção do pilot.conf já mesclada sobre a seção padrão e os defaults.
+
+    A resolução (seção > seção padrão > defaults do manager) é feita uma vez e
+    guardada; qualquer alteração no ConfigParser (set, reload...) invalida o cache.
+    """
+
+    def __init__(self, parser, section_name, default_section=None, defaults=None):
+        self.parser = parser
+        self.section_name = section_name
+        self.default_section = default_section
+        self.defaults = dict(defaults or {})
+        self._values = None
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        values = dict(SECTION_DEFAULTS.get(self.section_name, {}))
+        values.update(self.defaults)
+        for section in (self.default_section, self.section_name):
+            if section and self.parser.has_section(section):
+                values.update(self.parser.items(section))
+        return values
+
+    def invalidate(self):
+        self._values = None
+
+    def as_dict(self):
+        """Valores resolvidos da seção (recalculados só quando a configuração muda)."""
+        values, generation = self._values, self.parser.generation
+        if values is None or self._generation != generation:
+            with self._lock:
+                values = self._resolve()
+                self._values, self._generation = values, generation
+        return values
+
+    def get(self, key, fallback=_UNSET):
+        try:
+            return self.as_dict()[key]
+        except KeyError:
+            if fallback is _UNSET:
+                raise configparser.NoOptionError(key, self.section_name) from None
+            return fallback
+
+    def _convert(self, key, fallback, convert):
+        value = self.get(key, fallback)
+        if value is fallback and fallback is not _UNSET:
+            return fallback
+        return convert(value)
+
+    def getint(self, key, fallback=_UNSET):
+        return self._convert(key, fallback, int)
+
+    def getfloat(self, key, fallback=_UNSET):
+        return self._convert(key, fallback, float)
+
+    def getboolean(self, key, fallback=_UNSET):
+        def to_bool(value):
+            if value.lower() not in _BOOLEAN_STATES:
+                raise ValueError(f"Valor booleano inválido para '{key}': {value}")
+            return _BOOLEAN_STATES[value.lower()]
+        return self._convert(key, fallback, to_bool)
+
+    def getlist(self, key, fallback=_UNSET, separator=','):
+        """Lista de valores separados por `separator` (None = espaços), sem itens vazios."""
+        value = self._convert(key, fallback, lambda v: v.split(separator))
+        return [item.strip() for item in value if item.strip()] if isinstance(value, list) else value
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __contains__(self, key):
+        return key in self.as_dict()
+
 
 class Config(Singleton):
+    """
+    Configuração do pilot em camadas, da menos para a mais prioritária:
+
+    1. defaults embutidos (`pilot.default.SECTION_DEFAULTS`, aplicados pelas SectionViews);
+    2. pilot.conf do usuário (`user_config_file`);
+    3. pilot.conf do projeto, procurado subindo do diretório atual até a raiz do repositório;
+    4. variáveis de ambiente PILOT_<SEÇÃO>__<CHAVE>.
+
+    A mescla das camadas em arquivo fica num cache em JSON, validado pelo
+    mtime/tamanho de cada arquivo envolvido. As gravações (`save_config`)
+    sempre vão para o pilot.conf do projeto.
+    """
 
     def _initialize(self):
         self.log = Logger()
-        self.project_root = os.path.abspath(os.getcwd())
-        self.config_file = os.path.join(self.project_root, 'pilot.conf')
-        self.config = configparser.ConfigParser()
+        self.config = TrackedConfigParser()
+        self._views = {}
+        self._save_requested = False
         self.load_config()
+        atexit.register(self.flush)
+
+    def _cache_file(self, cwd):
+        key = hashlib.sha256(cwd.encode('utf-8')).hexdigest()[:16]
+        return get_cache_dir('config') / f"{key}.json"
+
+    def _load_cached_layers(self, cwd, user_file):
+        """Retorna `(arquivo do projeto, seções mescladas)`, do cache quando nada mudou."""
+        cache_file = self._cache_file(cwd)
+        cached = read_json(cache_file, default={})
+        if cached.get('format') == CACHE_FORMAT and cached.get('user_file') == user_file and all(
+            stat_signature(path) == signature for path, signature in cached.get('sources', [])
+        ):
+            return cached['project_file'], cached['sections']
+
+        project_file, candidates = find_project_config(cwd)
+        watched = [user_file] + [path for path in candidates if path != project_file]
+        if project_file:
+            watched.append(project_file)
+        sections = compile_layers([user_file, project_file])
+        try:
+            write_json_atomic(cache_file, {
+                'format': CACHE_FORMAT,
+                'user_file': user_file,
+                'project_file': project_file,
+                'sources': [[path, stat_signature(path)] for path in watched],
+                'sections': sections,
+            })
+        except OSError as e:
+            self.log.debug(f"Não foi possível gravar o cache de configuração: {e}")
+        return project_file, sections
 
     def load_config(self, specific_config=None):
-        """Carrega as configurações do arquivo pilot.conf ou de um arquivo específico."""
+        """Carrega as camadas de configuração ou, com `specific_config`, um arquivo extra por cima delas."""
         try:
-            config_path = self.config_file if not specific_config else os.path.join(self.project_root, specific_config)
-            
-            if not os.path.exists(config_path):
-                self.log.error(f"Não encontrou 'pilot.conf' no caminho: {config_path}")
-                return  # Retorna caso o arquivo não seja encontrado
-            
-            self.config.read(config_path)  # Lê o arquivo de configuração usando configparser
+            if specific_config:
+                config_path = os.path.join(self.project_root, specific_config)
+                if not os.path.exists(config_path):
+                    self.log.error(f"Não encontrou '{specific_config}' no caminho: {config_path}")
+                    return
+                self.config.read(config_path, encoding='utf-8')
+                return
+
+            cwd = os.path.abspath(os.getcwd())
+            project_file, sections = self._load_cached_layers(cwd, user_config_file())
+            if project_file:
+                self.project_root = os.path.dirname(project_file)
+            else:
+                self.project_root = cwd
+                self.log.error(f"Não encontrou 'pilot.conf' no caminho: {cwd} (nem nos diretórios acima)")
+            self.config_file = os.path.join(self.project_root, CONFIG_FILENAME)
+
+            self.config.read_dict(sections)
+            self.config.read_dict(environment_layer())
+            self.config.generation += 1
         except Exception as e:
             self.log.error(f"Erro ao carregar o arquivo de configuração: {str(e)}")
             sys.exit(1)  # Interrompe o processo com um código de saída 1 (indicando erro)
 
     def save_config(self):
-        """Salva as configurações no arquivo .conf."""
+        """Marca as alterações para serem gravadas no pilot.conf ao final do comando (ver `flush`)."""
+        self._save_requested = True
+
+    def _lock_path(self):
+        key = hashlib.sha256(os.path.abspath(self.config_file).encode('utf-8')).hexdigest()[:16]
+        return get_cache_dir('locks') / f"config-{key}.lock"
+
+    def flush(self):
+        """
+        Grava as alterações pendentes no pilot.conf; sem alterações, não escreve nada.
+
+        Sob um lock entre processos, relê o arquivo atual, reaplica só as
+        operações feitas por este processo (as chaves alteradas por outro
+        processo são preservadas) e troca o arquivo de forma atômica.
+        """
+        if not (self._save_requested and self.config.changes):
+            return False
         try:
-            with open(self.config_file, 'w') as configfile:
-                self.config.write(configfile)
+            with FileLock(self._lock_path()):
+                current = None
+                merged = configparser.ConfigParser(interpolation=None)
+                if os.path.exists(self.config_file):
+                    with open(self.config_file, 'r', encoding='utf-8') as configfile:
+                        current = configfile.read()
+                    merged.read_string(current, source=self.config_file)
+
+                apply_changes(merged, self.config.changes)
+                buffer = io.StringIO()
+                merged.write(buffer)
+                if buffer.getvalue() != current:
+                    write_text_atomic(self.config_file, buffer.getvalue())
+
+            self.config.changes.clear()
+            self._save_requested = False
+            return True
         except Exception as e:
             self.log.error(f"Erro ao salvar o arquivo de configuração: {str(e)}")
+            return False
 
     def get_config(self):
         """Retorna a instância do ConfigParser."""
         return self.config
 
-    def get(self, key, fallback=None):
-        """Obtém o valor de uma chave usando a seção e a seção padrão da classe chamadora."""
-        try:
-            caller_class = self._get_caller_class()
+    def section(self, section_name, default_section=None, defaults=None):
+        """Retorna a SectionView (compartilhada) de uma seção."""
+        key = (section_name, default_section)
+        view = self._views.get(key)
+        if view is None:
+            view = self._views.setdefault(key, SectionView(self.config, section_name, default_section, defaults))
+        elif defaults and not defaults.keys() <= view.defaults.keys():
+            view.defaults.update((k, v) for k, v in defaults.items() if k not in view.defaults)
+            view.invalidate()
+        return view
 
-            section_name = getattr(caller_class, 'section_name')
-            default_section = getattr(caller_class, 'default_section')
-
-            if section_name and self.config.get(section_name, key):
-                return self.config.get(section_name, key)
-            elif default_section and self.config.get(default_section, key):
-                return self.config.get(default_section, key)
-
-        except Exception as e:
-            self.log.error(str(e))
-            
-
-    def _get_caller_class(self):
-        """Obtém a instância da classe chamadora da stack de chamadas."""
-        frame = inspect.currentframe()
-        try:
-            if frame is not None and frame.f_back is not None and frame.f_back.f_back is not None:
-                caller_frame = frame.f_back.f_back  # Suba dois níveis na stack
-                caller_instance = caller_frame.f_locals.get('self', None)
-                if caller_instance:
-                    return caller_instance
-            else:
-                self.log.error("Não foi possível determinar a classe invocante. O frame de chamada é None.")
-                return None
-        except Exception as e:
-            self.log.error(f"Erro ao determinar a classe invocante: {str(e)}")
-            return None
-        finally:
-            del frame  # Evita possíveis ciclos de referência
+    def get(self, section_name, key, fallback=None, default_section=None):
+        """Obtém o valor de uma chave na seção, com a seção padrão como alternativa."""
+        return self.section(section_name, default_section).get(key, fallback)
@@ -1,12 +1,32 @@
 # pilot\src\context.py
+import os
+import re
+import sys
+import shlex
+import gzip
+import signal
+import subprocess
+import asyncio
+import threading
+import contextlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from pilot.singleton import Singleton
 from pilot.src.log import Logger
 from pilot.src.config import Config
 from pilot.default.context import CONTEXT_DEFAULTS
 
-from invoke.context import Context as InvokeContext
-from invoke.exceptions import UnexpectedExit
+# Caracteres que exigem um shell para interpretar o comando (pipes, redirecionamentos...)
+SHELL_METACHARACTERS = set('|&;<>$`*?')
+READ_CHUNK_SIZE = 64 * 1024
+# Maior registro guardado à espera do separador no modo streaming
+MAX_RECORD_SIZE = 64 * 1024
+NEWLINES = re.compile(rb'\r\n|\r|\n')
+# Credenciais embutidas em URLs (ex.: https://aws:<token>@...) não vão para logs nem para o trace
+CREDENTIALS_IN_URL = re.compile(r'://[^\s/:@]+:[^\s@]+@')
+# Retornado por um `on_line` para encerrar o comando sem ler o resto da saída
+STOP_STREAM = object()
 
 
 class CustomResult:
@@ -14,68 +34,383 @@ class CustomResult:
         self.stdout = stdout
         self.stderr = stderr
         self.return_code = return_code
+        self.output_bytes = len(stdout) + len(stderr)
+        self.stopped = False  # Encerrado por STOP_STREAM antes do fim da saída
 
     @property
     def ok(self):
-        """Retorna True se o return_code for 0, indicando sucesso."""
-        return self.return_code == 0
+        """Retorna True se o return_code for 0 (ou se o comando foi encerrado a pedido via STOP_STREAM)."""
+        return self.return_code == 0 or self.stopped
+
+
+def redact(command):
+    """Comando em texto para logs e trace, sem credenciais embutidas em URLs."""
+    display = command if isinstance(command, str) else shlex.join(command)
+    return CREDENTIALS_IN_URL.sub('://***@', display)
+
+
+def active_tracer():
+    """
+    Tracer ligado por `pilot --trace`, ou None.
+
+    O módulo de trace só é importado pelo `--trace`; sem ele carregado, o
+    tracing está desligado e nada do trace é importado aqui.
+    """
+    trace = sys.modules.get('pilot.src.trace')
+    if trace is not None and trace.Tracer().enabled:
+        return trace.Tracer()
+    return None
+
+
+def _describe_caller(frame):
+    from pilot.src.trace import describe_caller
+    return describe_caller(frame)
+
+
+class _SlotRequest:
+    """Espera por uma vaga de um semáforo numa thread; se cancelada, a vaga não se perde."""
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.lock = threading.Lock()
+        self.cancelled = False
+        self.acquired = False
+
+    def wait(self):
+        while True:
+            got = self.slots.acquire(timeout=0.1)
+            with self.lock:
+                if self.cancelled:
+                    if got:
+                        self.slots.release()
+                    return
+                if got:
+                    self.acquired = True
+                    return
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            if self.acquired:
+                self.slots.release()
 
 
 class Context(Singleton):
 
     def _initialize(self):
-        # Cria um contexto do Invoke para execução de comandos de terminal
         self.section_name = 'context'
         self.default_section = 'context_git'
-        self.invoke_context = InvokeContext()
         self.log = Logger()
         self.config = Config().config
+        self.settings = Config().section(self.section_name, defaults=CONTEXT_DEFAULTS)
         self.init()
 
+        # Limite de comandos simultâneos no processo todo: cada `run` síncrono cria
+        # o próprio event loop, então um semáforo do asyncio não limitaria nada
+        self._slots = threading.BoundedSemaphore(max(1, self.settings.getint('max_concurrency')))
+
         # Inicializa o contexto do Click, se necessário
         self.click_context = None
     def init(self):
-        """Inicializa a seção 'log' no arquivo de configuração."""
+        """Inicializa a seção 'context' em memória.
+
+        Não pede gravação: a seção só vai para o pilot.conf junto com o próximo
+        comando que salvar a configuração, então comandos de leitura não escrevem nada.
+        """
         if not self.config.has_section(self.section_name):
             self.config.add_section(self.section_name)
             for key, default_value in CONTEXT_DEFAULTS.items():
                 self.config.set(self.section_name, key, self.config.get(self.section_name, key, fallback=default_value))
-            Config().save_config()  # Salva as configurações no arquivo pilot.conf
 
     def set_click_context(self, click_ctx):
         """Define o contexto do Click."""
         self.click_context = click_ctx
 
-    def run(self, command: str) -> CustomResult:
-        """Executa um comando no terminal usando o Invoke e captura erros."""
-        verbosity = self.config['context']['verbosity']
-
+    @contextlib.asynccontextmanager
+    async def _command_slot(self):
+        """Ocupa uma das `max_concurrency` vagas de comando sem bloquear o event loop."""
+        if not self._slots.acquire(blocking=False):
+            request = _SlotRequest(self._slots)
+            try:
+                await asyncio.to_thread(request.wait)
+            except asyncio.CancelledError:
+                request.cancel()
+                raise
         try:
-            # Determina se o output deve ser ocultado com base na verbosidade
-            if verbosity == 'vvv':
-                result = self.invoke_context.run(command, hide=False, warn=True)
-            elif verbosity == 'vv':
-                result = self.invoke_context.run(command, hide=True, warn=True)
+            yield
+        finally:
+            self._slots.release()
+
+    async def _spawn(self, command, stdin, env):
+        """
+        Cria o processo: exec direto quando possível, shell quando o comando precisa de um.
+
+        No Windows, comandos em string sempre vão para o shell: o `cmd.exe` trata as
+        aspas e executa shims `.cmd` (ex.: `code.cmd`), que o exec direto não abre.
+        Retorna `(processo, via_shell)`; no shell o comando roda num grupo de
+        processos próprio, para que `_kill` encerre também os filhos do shell.
+        """
+        options = {
+            'stdin': stdin,
+            'stdout': asyncio.subprocess.PIPE,
+            'stderr': asyncio.subprocess.PIPE,
+            'env': {**os.environ, **env} if env else None,
+        }
+        if isinstance(command, (list, tuple)):
+            return await asyncio.create_subprocess_exec(*command, **options), False
+        if os.name == 'nt' or SHELL_METACHARACTERS & set(command):
+            if os.name == 'nt':
+                options['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
             else:
-                result = self.invoke_context.run(command, hide=True)
+                options['start_new_session'] = True
+            return await asyncio.create_subprocess_shell(command, **options), True
+        return await asyncio.create_subprocess_exec(*shlex.split(command), **options), False
+
+    @staticmethod
+    def _kill(process, shell):
+        """
+        Mata o processo; no modo shell, a árvore inteira (grupo no POSIX, `taskkill /T` no Windows).
 
-            # Verifica o return_code antes de retornar o resultado
-            if result and result.return_code == 0:
-                return CustomResult(stdout=result.stdout, stderr=result.stderr, return_code=result.return_code)
+        No POSIX o sinal vai por `os.kill`/`os.killpg`, sem `process.kill()`: o
+        `Popen.send_signal` chama `poll()` antes e, se o processo já terminou,
+        coleta o filho antes do watcher do asyncio ("Unknown child process pid").
+        """
+        try:
+            if os.name == 'nt':
+                if shell:
+                    subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)], capture_output=True)
+                else:
+                    process.kill()
+            elif shell:
+                os.killpg(process.pid, signal.SIGKILL)
             else:
+                os.kill(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass  # Já terminou
+
+    async def _read_stream(self, stream, chunks, echo):
+        while chunk := await stream.read(READ_CHUNK_SIZE):
+            chunks.append(chunk)
+            if echo:
+                if hasattr(echo, 'buffer'):
+                    echo.buffer.write(chunk)
+                else:
+                    echo.write(chunk.decode('utf-8', errors='replace'))
+                echo.flush()
+
+    async def _stream_lines(self, stream, name, sink, byte_counter, separator='\n'):
+        """Lê o stream em blocos e entrega cada registro completo a `sink(registro, nome)`.
+
+        Os registros são separados por `separator` (ex.: '\\0' para saídas `-z` do git);
+        com '\\n', '\\r' também separa (barras de progresso do docker/pip reescrevem a
+        linha com '\\r'). Um registro sem separador maior que `MAX_RECORD_SIZE` é
+        entregue em pedaços, então a memória usada não depende do tamanho da saída.
+        Para de ler assim que `sink` retornar STOP_STREAM.
+        """
+        if separator == '\n':
+            delimiter = NEWLINES
+        else:
+            delimiter = re.compile(re.escape(separator.encode('utf-8')))
+        pending = bytearray()
+
+        def emit(record):
+            return sink(record.decode('utf-8', errors='replace'), name)
+
+        while chunk := await stream.read(READ_CHUNK_SIZE):
+            byte_counter[name] += len(chunk)
+            pending += chunk
+            start = 0
+            for match in delimiter.finditer(pending):
+                if match.group() == b'\r' and match.end() == len(pending):
+                    break  # Pode ser a primeira metade de um \r\n dividido entre blocos
+                if emit(pending[start:match.start()]) is STOP_STREAM:
+                    return
+                start = match.end()
+            del pending[:start]
+
+            while len(pending) >= MAX_RECORD_SIZE:
+                if emit(pending[:MAX_RECORD_SIZE]) is STOP_STREAM:
+                    return
+                del pending[:MAX_RECORD_SIZE]
+
+        if separator == '\n' and pending.endswith(b'\r'):
+            del pending[-1:]
+        if pending:
+            emit(pending)
+
+    async def _write_stdin(self, process, input):
+        process.stdin.write(input.encode('utf-8'))
+        await process.stdin.drain()
+        process.stdin.close()
+
+    async def arun(self, command, input=None, timeout=None, env=None, _caller=None, **stream_options) -> CustomResult:
+        """Versão assíncrona do `run`, baseada em `asyncio.create_subprocess_exec`.
+
+        `command` pode ser uma string ou uma lista de argumentos. O número de
+        comandos simultâneos no processo (de qualquer thread ou event loop) é
+        limitado por `max_concurrency` e cada comando
+        é encerrado após `timeout` segundos (padrão: `command_timeout`, 0 = sem limite).
+        Permite `asyncio.gather` de comandos independentes.
+
+        Com `stream=True` a saída é processada linha a linha e não é acumulada:
+        cada linha vai para `on_line(linha, 'stdout'|'stderr')` (por padrão é
+        exibida no terminal, exceto na verbosidade 'v'), opcionalmente para um
+        `log_file` comprimido com gzip, e só as últimas `tail_lines` linhas de
+        cada stream ficam no `CustomResult` para relatório de erro. `separator`
+        troca o separador de linhas (ex.: '\\0'), e um `on_line` que retorne
+        STOP_STREAM encerra o comando na hora (`result.stopped`).
+        """
+        tracer = active_tracer()
+        if tracer is None:
+            return await self._arun(command, input, timeout, env, **stream_options)
+
+        caller = _caller or _describe_caller(sys._getframe(1))
+        display = redact(command)
+        start = tracer.now()
+        result = await self._arun(command, input, timeout, env, **stream_options)
+        tracer.add(
+            ' '.join(display.split()[:2]),
+            'command',
+            start,
+            tracer.now(),
+            caller=caller,
+            command=display,
+            exit_code=result.return_code,
+            output_bytes=result.output_bytes,
+        )
+        return result
+
+    async def _arun(self, command, input, timeout, env,
+                    stream=False, on_line=None, log_file=None, tail_lines=None, separator='\n') -> CustomResult:
+        verbosity = self.settings.get('verbosity')
+        timeout = timeout if timeout is not None else self.settings.getfloat('command_timeout')
+        display = redact(command)
+
+        async with self._command_slot():
+            log_handle = None
+            try:
+                stdin = asyncio.subprocess.PIPE if input is not None else None
+                process, shell = await self._spawn(command, stdin, env)
+
+                chunks = {'stdout': [], 'stderr': []}
+                byte_counter = {'stdout': 0, 'stderr': 0}
+                stopped = False
+                tails = {}
+                if stream:
+                    tail_lines = tail_lines or self.settings.getint('stream_tail_lines')
+                    tails = {'stdout': deque(maxlen=tail_lines), 'stderr': deque(maxlen=tail_lines)}
+                    if on_line is None and verbosity != 'v':
+                        on_line = self._echo_line
+                    if log_file:
+                        log_handle = gzip.open(log_file, 'at', encoding='utf-8')
+
+                    def sink(line, name):
+                        nonlocal stopped
+                        tails[name].append(line)
+                        if log_handle:
+                            log_handle.write(line + '\n')
+                        if on_line and on_line(line, name) is STOP_STREAM:
+                            stopped = True
+                            if process.returncode is None:
+                                self._kill(process, shell)
+                            return STOP_STREAM
+
+                    io_tasks = [
+                        self._stream_lines(process.stdout, 'stdout', sink, byte_counter, separator),
+                        self._stream_lines(process.stderr, 'stderr', sink, byte_counter, separator),
+                    ]
+                else:
+                    io_tasks = [
+                        self._read_stream(process.stdout, chunks['stdout'], sys.stdout if verbosity == 'vvv' else None),
+                        self._read_stream(process.stderr, chunks['stderr'], sys.stderr if verbosity == 'vvv' else None),
+                    ]
+                if input is not None:
+                    io_tasks.append(self._write_stdin(process, input))
+
+                def captured(name):
+                    if stream:
+                        return '\n'.join(tails[name])
+                    return b''.join(chunks[name]).decode('utf-8', errors='replace')
+
+                try:
+                    await asyncio.wait_for(asyncio.gather(*io_tasks, process.wait()), timeout=timeout or None)
+                except asyncio.TimeoutError:
+                    self._kill(process, shell)
+                    await process.wait()
+                    self.log.error(f"Comando excedeu o timeout de {timeout}s: {display}")
+                    return CustomResult(
+                        stdout=captured('stdout'),
+                        stderr=f"Timeout de {timeout}s excedido",
+                        return_code=-1,
+                    )
+
+                result = CustomResult(
+                    stdout=captured('stdout'),
+                    stderr=captured('stderr'),
+                    return_code=process.returncode,
+                )
+                if stream:
+                    result.output_bytes = byte_counter['stdout'] + byte_counter['stderr']
+                    result.stopped = stopped
+                else:
+                    result.output_bytes = sum(len(chunk) for name in chunks for chunk in chunks[name])
+
+            except Exception as e:
+                self.log.error(f"Erro inesperado ao executar o comando: {display}\n{str(e)}")
+                return CustomResult(stderr=str(e), return_code=-1)
+            finally:
+                if log_handle:
+                    log_handle.close()
+
+        # Verifica o return_code antes de retornar o resultado
+        if not result.ok:
+            if verbosity in ('vv', 'vvv'):
                 self.log.warning(f"Comando retornou um código de saída diferente de 0")
-                return CustomResult()
+            else:
+                self.log.error(f"Erro ao executar o comando: {display}\n{result.stderr}")
+        return result
+
+    def _echo_line(self, line, name):
+        print(line, file=sys.stderr if name == 'stderr' else sys.stdout, flush=True)
+
+    def run(self, command, input=None, timeout=None, env=None, **stream_options) -> CustomResult:
+        """Executa um comando no terminal e captura erros.
 
+        Wrapper síncrono do `arun`. `input`, se informado, é enviado ao stdin do
+        comando (ex.: senhas). `stream_options` são repassadas ao `arun`
+        (`stream`, `on_line`, `log_file`, `tail_lines`, `separator`).
+        """
+        caller = _describe_caller(sys._getframe(1)) if active_tracer() else None
+        return self._run_sync(self.arun(command, input=input, timeout=timeout, env=env, _caller=caller, **stream_options))
 
-        except UnexpectedExit as e:
-            self.log.error(f"Erro ao executar o comando: {command}\n{e.result.stderr}")
-            return CustomResult(stdout=e.result.stdout, stderr=e.result.stderr, return_code=e.result.return_code)
-        except Exception as e:
-            self.log.error(f"Erro inesperado ao executar o comando: {command}\n{str(e)}")
-            return CustomResult(stderr=str(e), return_code=-1)
+    def run_all(self, commands, timeout=None):
+        """Executa comandos independentes ao mesmo tempo e retorna os resultados na mesma ordem."""
+        caller = _describe_caller(sys._getframe(1)) if active_tracer() else None
+
+        async def gather():
+            return await asyncio.gather(*(self.arun(command, timeout=timeout, _caller=caller) for command in commands))
+        return self._run_sync(gather())
+
+    def _run_sync(self, coroutine):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+
+        # Já existe um loop nesta thread: executa a coroutine em outra thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
 
     def get_click_option(self, option_name):
         """Obtém uma opção do contexto do Click."""
-        if self.click_context:
-            return self.click_context.params.get(option_name)
-        return None
\ No newline at end of file
+        click_context = self.click_context or self._current_click_context()
+        if click_context:
+            return click_context.params.get(option_name)
+        return None
+
+    def _current_click_context(self):
+        """Obtém o contexto raiz do Click em execução, se houver."""
+        import click
+
+        current = click.get_current_context(silent=True)
+        return current.find_root() if current else None
@@ -1,155 +1,293 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from pilot.base.manager import BaseManager
 from pilot.base.pipeline import BaseDeployPipeline
+from pilot.src.config import Config
 from pilot.default.deploy import DEPLOY_DEFAULTS
-from pilot.src.docker import DockerManager
+from pilot.src.docker import DockerManager, BUILD_DIGEST_LABEL
 from pilot.src.aws import AWSManager
 
 SECTION_NAME = 'deploy'
 DEFAULT_SECTION = 'default_deploy'
+# Alvos de deploy: seções [deploy:<nome>], herdando o que não definirem da seção [deploy]
+TARGET_PREFIX = 'deploy:'
+
+
+class DeployResult:
+    def __init__(self, target, section_name):
+        self.target = target
+        self.section_name = section_name
+        self.ok = False
+        self.duration = 0.0
+        self.failed_step = None
+        self.error = None
 
 class DeployManager(BaseManager):
     def __init__(self):
         super().__init__()
         self.section_name = SECTION_NAME
         self.default_section = DEFAULT_SECTION
+        self.defaults = DEPLOY_DEFAULTS
         self.pipeline = None
 
     def init(self, **kwargs):
-        if not self.config.has_section(self.section_name):
-            self.config.add_section(self.section_name)
-
-        for key, value in DEPLOY_DEFAULTS.items():
-            self.config.set(self.section_name, key, kwargs.get(key, value)) 
+        self.init_section(DEPLOY_DEFAULTS, **kwargs)
 
         self.save_config()
 
-    def select_pipeline(self):
-        # Certifique-se de que o section_name está definido
-        pipeline_type = self.config[self.section_name]['pipeline_type']
+    def list_targets(self):
+        """Nomes dos alvos definidos em seções [deploy:<nome>]."""
+        return [
+            section[len(TARGET_PREFIX):] for section in self.config.sections()
+            if section.startswith(TARGET_PREFIX)
+        ]
 
-        if pipeline_type == 'remote_docker':
-            self.pipeline = RemoteDockerDeployPipeline()
-        elif pipeline_type == 'ecr':
-            self.pipeline = EcrDeployPipeline()
-        else:
-            self.log.error(f"Pipeline '{pipeline_type}' não suportado.")
+    def select_pipeline(self, section_name=SECTION_NAME):
+        self.pipeline = self.create_pipeline(section_name)
+        return self.pipeline
 
-    def execute_deploy(self):
-        self.select_pipeline()
-        if self.pipeline:
-            self.pipeline.execute()
+    def create_pipeline(self, section_name=SECTION_NAME):
+        """Cria o pipeline configurado em `pipeline_type` na seção (ou alvo) informada."""
+        default_section = SECTION_NAME if section_name != SECTION_NAME else DEFAULT_SECTION
+        pipeline_type = Config().section(section_name, default_section, DEPLOY_DEFAULTS).get('pipeline_type')
+
+        if pipeline_type == 'remote_docker':
+            return RemoteDockerDeployPipeline(section_name, default_section)
+        if pipeline_type == 'ecr':
+            return EcrDeployPipeline(section_name, default_section)
+        self.log.error(f"Pipeline '{pipeline_type}' não suportado.")
+        return None
+
+    def execute_deploy(self, resume=False, targets=None):
+        """
+        Executa o deploy e retorna um DeployResult por alvo.
+
+        Sem seções [deploy:*], roda o pipeline da seção [deploy]. Com elas, roda
+        os alvos pedidos em `targets` (padrão: todos) em paralelo, até
+        `max_parallel_targets` por vez; a falha de um alvo não interrompe os demais.
+        """
+        available = self.list_targets()
+        if targets:
+            unknown = sorted(set(targets) - set(available))
+            if unknown:
+                self.log.error(f"Alvos de deploy não encontrados: {', '.join(unknown)}")
+                return {}
+        elif available:
+            targets = available
         else:
-            self.log.error("Pipeline não selecionado.")
+            return {SECTION_NAME: self._deploy_target(SECTION_NAME, SECTION_NAME, resume)}
+
+        max_parallel = max(1, self.settings.getint('max_parallel_targets'))
+        self.log.info(f"Deploy em {len(targets)} alvo(s), até {max_parallel} em paralelo...")
+        with ThreadPoolExecutor(max_workers=min(max_parallel, len(targets))) as executor:
+            futures = {
+                target: executor.submit(self._deploy_target, target, TARGET_PREFIX + target, resume)
+                for target in targets
+            }
+            results = {target: future.result() for target, future in futures.items()}
+
+        self.log.info(f"Resumo do deploy:\n{self.report(results)}")
+        return results
+
+    def _deploy_target(self, target, section_name, resume):
+        result = DeployResult(target, section_name)
+        start = time.perf_counter()
+        try:
+            pipeline = self.create_pipeline(section_name)
+            if pipeline is None:
+                result.error = "Pipeline não selecionado."
+            else:
+                result.ok = pipeline.execute(resume=resume) is not None
+                if pipeline.error:
+                    result.failed_step = pipeline.error.step_name
+                    result.error = str(pipeline.error)
+        except Exception as e:
+            result.error = str(e)
+            self.log.error(f"Erro no deploy do alvo '{target}': {e}")
+        result.duration = time.perf_counter() - start
+        return result
+
+    @staticmethod
+    def report(results):
+        """Relatório texto com status, duração e etapa que falhou em cada alvo."""
+        lines = []
+        for target, result in results.items():
+            status = 'ok' if result.ok else 'falhou'
+            detail = f"  etapa: {result.failed_step}" if result.failed_step else (f"  {result.error}" if result.error else '')
+            lines.append(f"  {target:<20} {status:<7} {result.duration:7.2f}s{detail}")
+        failed = sum(1 for result in results.values() if not result.ok)
+        lines.append(f"  {len(results) - failed} ok, {failed} com falha")
+        return '\n'.join(lines)
 
     def update(self, **kwargs):
         raise NotImplementedError
 
 
-class RemoteDockerDeployPipeline(BaseDeployPipeline):
-    def __init__(self):
+class DockerImagePipelineMixin:
+    """Etapas comuns aos pipelines que constroem a imagem a partir do pacote publicado."""
+
+    def step_codeartifact_url(self):
+        codeartifact_url = self.aws_manager.get_codeartifact_url()
+        if not codeartifact_url:
+            raise RuntimeError("Não foi possível obter a URL do CodeArtifact.")
+        return codeartifact_url
+
+    def step_package_version(self):
+        package_name = self.config['publish']['package_name']
+        # Ordenação PEP 440 sobre o índice local de versões (atualizado só com as novas)
+        latest_version = self.aws_manager.get_latest_package_version(
+            package_name,
+            allow_prereleases=self.settings.getboolean('allow_prereleases'),
+            status=self.settings.get('version_status'),
+            allow_local=self.settings.getboolean('allow_local'),
+        )
+        if not latest_version:
+            raise RuntimeError(f"Nenhuma versão encontrada para o pacote '{package_name}'.")
+        self.log.info(f"Última versão do pacote '{package_name}' obtida: {latest_version}")
+        return latest_version
+
+    def step_build_image(self, docker_context, codeartifact_url, latest_version, ecr_url=None):
+        image_name = self.config['publish']['package_name']
+        dockerfile_path = os.path.abspath(os.getcwd())
+
+        # Alvos no mesmo daemon constroem um de cada vez: o rmi/build de um não apaga a tag do outro
+        with self.docker_manager.build_lock():
+            # Pula o build se a imagem local já foi gerada a partir do mesmo conteúdo
+            build_digest = self.docker_manager.calcular_digest_build(dockerfile_path, latest_version)
+            if self.docker_manager.imagem_com_digest(image_name, latest_version, build_digest):
+                self.log.info(f"Imagem {image_name}:{latest_version} já está atualizada. Build ignorado.")
+            else:
+                if self.docker_manager.verificar_existencia_imagem(image_name, latest_version):
+                    self.docker_manager.remover_imagem(image_name, latest_version)
+
+                self.docker_manager.build_docker_image(
+                    dockerfile_path, image_name, latest_version, codeartifact_url,
+                    labels={BUILD_DIGEST_LABEL: build_digest},
+                    cache_from=self.settings.get('cache_from'),
+                    cache_to=self.settings.get('cache_to'),
+                    url_as_build_arg=self.settings.getboolean('codeartifact_build_arg'),
+                    builder=self.settings.get('buildx_builder'),
+                )
+            image_id = self.docker_manager.image_id(image_name, latest_version)
+            if not image_id:
+                raise RuntimeError(f"A imagem {image_name}:{latest_version} não foi criada.")
+
+        return {'image_name': image_name, 'image_version': latest_version, 'image_id': image_id}
+
+    def image_exists(self, image_name, image_version, image_id=None):
+        """Valida um checkpoint de build: a tag ainda precisa apontar para a mesma imagem construída."""
+        current = self.docker_manager.image_id(image_name, image_version)
+        if image_id and current != image_id:
+            self.log.info(f"{image_name}:{image_version} mudou desde o checkpoint ({current or 'removida'}).")
+        return bool(image_id) and current == image_id
+
+
+class RemoteDockerDeployPipeline(DockerImagePipelineMixin, BaseDeployPipeline):
+    """Pipeline para buildar e publicar containers em máquinas remotas"""
+
+    def __init__(self, section_name=SECTION_NAME, default_section=DEFAULT_SECTION):
         super().__init__()
-        self.section_name = SECTION_NAME
-        self.default_section = DEFAULT_SECTION
+        self.section_name = section_name
+        self.default_section = default_section
+        self.defaults = DEPLOY_DEFAULTS
         self.docker_manager = DockerManager()  # Inicializa o gerenciador Docker
         self.aws_manager = AWSManager()        # Inicializa o gerenciador AWS
 
-    def execute(self):
-        """Pipeline para buildar e publicar containers em máquinas remotas"""
-        try:
-            # 1. Verificar o contexto Docker usando o contexto armazenado
-            self.docker_manager.mudar_contexto_docker(self.config['docker']['docker_context'])
-
-            # 2. Obter a URL do CodeArtifact com token
-            codeartifact_url = self.aws_manager.get_codeartifact_url()
-
-            # 3. Obter a versão do pacote do CodeArtifact
-            package_info = self.aws_manager.get_package_info(self.config['publish']['package_name'])
-
-            # 4. Ordena as versões pela chave 'version' e retorna a última
-            latest_package = max(package_info, key=lambda v: list(map(int, v['version'].split('.')))) #type:ignore
-            latest_version = latest_package['version']
-            self.log.info(f"Última versão do pacote '{self.config['publish']['package_name']}' obtida: {latest_version}")
-
-            image_name = self.config['publish']['package_name']
-            dockerfile_path = os.path.abspath(os.getcwd())
-
-            # 5. Verifica se a imagem já existe e remove se necessário
-            if self.docker_manager.verificar_existencia_imagem(image_name, latest_version):
-                self.docker_manager.remover_imagem(image_name, latest_version)
-
-            # 6. Build da imagem Docker
-            self.docker_manager.build_docker_image(dockerfile_path, image_name, latest_version, codeartifact_url)
-
-            # 7. Taguear a imagem com a versão do pacote
-            self.docker_manager.tag_image(image_name, latest_version, image_name, "latest")
+    def define_steps(self):
+        # Contexto Docker, URL do CodeArtifact e versão do pacote não dependem entre si
+        self.add_step('docker_context', self.step_docker_context, outputs=['docker_context'])
+        self.add_step('codeartifact_url', self.step_codeartifact_url, outputs=['codeartifact_url'])
+        self.add_step('package_version', self.step_package_version, outputs=['latest_version'], checkpoint=True)
+        self.add_step(
+            'build_image', self.step_build_image,
+            inputs=['docker_context', 'codeartifact_url', 'latest_version'], outputs=['image_name', 'image_version', 'image_id'],
+            checkpoint=True, validate=self.image_exists, volatile_inputs=['codeartifact_url'],
+        )
+        self.add_step('tag_image', self.step_tag_image, inputs=['image_name', 'latest_version'])
+
+    def step_docker_context(self):
+        # Alvos [deploy:*] definem o próprio contexto; o deploy único usa o da seção [docker]
+        if self.section_name != SECTION_NAME and self.config.has_option(self.section_name, 'docker_context'):
+            docker_context = self.config.get(self.section_name, 'docker_context')
+        else:
+            docker_context = self.config['docker']['docker_context']
+        # `docker --context` em cada comando: alvos em paralelo não disputam o contexto global
+        self.docker_manager.docker_context = docker_context
+        return docker_context
 
-            self.log.info("Deploy completado com sucesso!")
+    def step_tag_image(self, image_name, latest_version):
+        # Taguear a imagem com a versão do pacote
+        self.docker_manager.tag_image(image_name, latest_version, image_name, "latest")
+        self.log.info("Deploy completado com sucesso!")
 
-        except Exception as e:
-            self.log.error(str(e))
 
+class EcrDeployPipeline(DockerImagePipelineMixin, BaseDeployPipeline):
+    """Pipeline para buildar e enviar uma imagem Docker para o ECR"""
 
-class EcrDeployPipeline(BaseDeployPipeline):
-    def __init__(self):
+    def __init__(self, section_name=SECTION_NAME, default_section=DEFAULT_SECTION):
         super().__init__()
-        self.section_name = SECTION_NAME
-        self.default_section = DEFAULT_SECTION
+        self.section_name = section_name
+        self.default_section = default_section
+        self.defaults = DEPLOY_DEFAULTS
         self.docker_manager = DockerManager()  # Inicializa o gerenciador Docker
         self.aws_manager = AWSManager()        # Inicializa o gerenciador AWS
-    
-    def execute(self):
-        """Pipeline para buildar e enviar uma imagem Docker para o ECR"""
-        try:
-
-            # 0. Verificar o contexto Docker usando o contexto armazenado
-            self.docker_manager.mudar_contexto_docker('default')
-
-            # 1. Obter a URL do CodeArtifact com token
-            codeartifact_url = self.aws_manager.get_codeartifact_url()
-
-            # 2. Obter a versão do pacote do CodeArtifact
-            package_info = self.aws_manager.get_package_info(self.config['publish']['package_name'])
-
-            # 3. Ordena as versões pela chave 'version' e retorna a última
-            latest_package = max(package_info, key=lambda v: list(map(int, v['version'].split('.')))) #type:ignore
-            latest_version = latest_package['version']
-            self.log.info(f"Última versão do pacote '{self.config['publish']['package_name']}' obtida: {latest_version}")
 
-            image_name = self.config['publish']['package_name']
-            dockerfile_path = os.path.abspath(os.getcwd())
-
-            # 4. Verifica se a imagem já existe e remove se necessário
-            if self.docker_manager.verificar_existencia_imagem(image_name, latest_version):
-                self.docker_manager.remover_imagem(image_name, latest_version)
-
-            # 5. Build da imagem Docker
-            self.docker_manager.build_docker_image(dockerfile_path, image_name, latest_version, codeartifact_url)
-
-            # 6. Autenticar no ECR
-            region = self.config.get('aws', 'aws_default_region', fallback='us-east-1')
-            account_id = self.config.get('aws', 'aws_account_id')
-            ecr_url = f"{account_id}.dkr.ecr.{region}.amazonaws.com"
-
-            self.log.info("Autenticando no ECR...")
-            auth_command = f"aws ecr get-login-password --region {region} | docker login --username AWS --password-stdin {ecr_url}"
-            self.ctx.run(auth_command)
-
-            # 7. Taggear a imagem com as versões e latest
-            self.log.info(f"Tagueando a imagem {image_name} com {latest_version} e 'latest'...")
-            self.docker_manager.tag_image(image_name, "latest", f"{ecr_url}/{image_name}", "latest")
-            self.docker_manager.tag_image(image_name, latest_version, f"{ecr_url}/{image_name}",latest_version)
-
-            # 8. Push da imagem para o ECR
-            self.log.info(f"Fazendo push da imagem {image_name} para o ECR...")
-            push_command_latest = f"docker push {ecr_url}/{image_name}:latest"
-            push_command_version = f"docker push {ecr_url}/{image_name}:{latest_version}"
-
-            self.ctx.run(push_command_latest)
-            self.ctx.run(push_command_version)
-
-            self.log.info(f"Imagem {image_name} enviada com sucesso para {ecr_url}.")
-
-        except Exception as e:
-            self.log.error(f"Erro durante o deploy no ECR: {str(e)}")
+    def define_steps(self):
+        self.add_step('docker_context', self.step_docker_context, outputs=['docker_context'])
+        self.add_step('codeartifact_url', self.step_codeartifact_url, outputs=['codeartifact_url'])
+        self.add_step('package_version', self.step_package_version, outputs=['latest_version'], checkpoint=True)
+        # O login no ECR roda em paralelo com o build, exceto quando o cache de camadas está no registry
+        self.add_step('ecr_login', self.step_ecr_login, outputs=['ecr_url'])
+        build_inputs = ['docker_context', 'codeartifact_url', 'latest_version']
+        if self.settings.get('cache_from') or self.settings.get('cache_to'):
+            build_inputs.append('ecr_url')
+        self.add_step(
+            'build_image', self.step_build_image,
+            inputs=build_inputs, outputs=['image_name', 'image_version', 'image_id'],
+            checkpoint=True, validate=self.image_exists, volatile_inputs=['codeartifact_url'],
+        )
+        self.add_step(
+            'tag_image', self.step_tag_image,
+            inputs=['image_name', 'latest_version', 'ecr_url'], outputs=['ecr_image'],
+        )
+        self.add_step(
+            'push_image', self.step_push_image,
+            inputs=['ecr_image', 'latest_version'], outputs=['pushed_tags'], checkpoint=True,
+        )
+
+    def step_docker_context(self):
+        docker_context = self.config.get(self.section_name, 'docker_context', fallback='default') \
+            if self.section_name != SECTION_NAME else 'default'
+        self.docker_manager.docker_context = docker_context
+        return docker_context
+
+    def step_ecr_login(self):
+        self.log.info("Autenticando no ECR...")
+        self.aws_manager.get_ecr_authentication_token()
+        return self.aws_manager.get_ecr_registry()
+
+    def step_tag_image(self, image_name, latest_version, ecr_url):
+        # Taggear a imagem com as versões e latest
+        ecr_image = f"{ecr_url}/{image_name}"
+        self.log.info(f"Tagueando a imagem {image_name} com {latest_version} e 'latest'...")
+        self.docker_manager.tag_image(image_name, latest_version, ecr_image, "latest")
+        self.docker_manager.tag_image(image_name, latest_version, ecr_image, latest_version)
+        return ecr_image
+
+    def step_push_image(self, ecr_image, latest_version):
+        self.log.info(f"Fazendo push da imagem {ecr_image} para o ECR...")
+        push_strategy = self.settings.get('push_strategy')
+        max_workers = self.settings.getint('push_max_workers')
+        registry_client = self.aws_manager.get_ecr_registry_client() if push_strategy == 'manifest' else None
+
+        timings = self.docker_manager.push_images(
+            ecr_image,
+            [latest_version, "latest"],
+            max_workers=max_workers,
+            registry_client=registry_client,
+        )
+
+        self.log.info(f"Imagem {ecr_image} enviada com sucesso.")
+        return list(timings)
@@ -0,0 +1,110 @@
+# pilot/src/digest.py
+import os
+import hashlib
+import fnmatch
+import functools
+import posixpath
+from pathlib import Path
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def load_dockerignore(context_path):
+    """Lê os padrões do .dockerignore do contexto (vazio se não existir)."""
+    dockerignore = Path(context_path) / '.dockerignore'
+    if not dockerignore.exists():
+        return []
+
+    patterns = []
+    for line in dockerignore.read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if line and not line.startswith('#'):
+            patterns.append(line)
+    return patterns
+
+
+@functools.lru_cache(maxsize=None)
+def _pattern_parts(pattern):
+    """Segmentos do padrão já normalizado (sem './', '//' nem barras nas pontas)."""
+    return tuple(part for part in posixpath.normpath(pattern.strip('/')).split('/') if part not in ('', '.'))
+
+
+def _match_parts(pattern_parts, path_parts):
+    """Casa segmento a segmento: `*` e `?` não atravessam '/', `**` casa qualquer número de diretórios."""
+    if not pattern_parts:
+        return not path_parts
+    head, rest = pattern_parts[0], pattern_parts[1:]
+    if head == '**':
+        return any(_match_parts(rest, path_parts[i:]) for i in range(len(path_parts) + 1))
+    return bool(path_parts) and fnmatch.fnmatchcase(path_parts[0], head) and _match_parts(rest, path_parts[1:])
+
+
+def matches_pattern(relative_path, pattern):
+    """True se o caminho, ou um diretório acima dele, casa com o padrão do .dockerignore."""
+    pattern_parts = _pattern_parts(pattern)
+    path_parts = relative_path.split('/')
+    return any(_match_parts(pattern_parts, path_parts[:end]) for end in range(1, len(path_parts) + 1))
+
+
+def is_ignored(relative_path, patterns):
+    """Aplica os padrões em ordem, como o Docker: o último que casar decide (`!` reinclui)."""
+    ignored = False
+    for pattern in patterns:
+        negate = pattern.startswith('!')
+        if matches_pattern(relative_path, pattern.lstrip('!').strip()):
+            ignored = not negate
+    return ignored
+
+
+def hash_file(digest, path):
+    with open(path, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+
+
+def hash_files(root, relative_paths, extra=()):
+    """
+    Calcula um sha256 sobre os caminhos (relativos a `root`) e seus conteúdos,
+    em ordem estável, mais os valores em `extra`.
+    """
+    digest = hashlib.sha256()
+    for value in extra:
+        digest.update(f"{value}\0".encode('utf-8'))
+
+    for relative_path in sorted(relative_paths):
+        digest.update(f"{relative_path}\0".encode('utf-8'))
+        hash_file(digest, Path(root) / relative_path)
+        digest.update(b'\0')
+
+    return digest.hexdigest()
+
+
+def build_context_files(context_path):
+    """Lista os arquivos do contexto de build que o Docker enviaria ao daemon."""
+    patterns = load_dockerignore(context_path)
+    files = []
+    for root, dirs, filenames in os.walk(context_path):
+        relative_root = os.path.relpath(root, context_path).replace(os.sep, '/')
+        relative_root = '' if relative_root == '.' else relative_root + '/'
+
+        # Poda diretórios inteiros ignorados (a menos que haja reinclusões com `!`)
+        if not any(p.startswith('!') for p in patterns):
+            dirs[:] = [d for d in dirs if not is_ignored(relative_root + d, patterns)]
+
+        for filename in filenames:
+            relative_path = relative_root + filename
+            # Symlinks quebrados (e arquivos removidos durante a varredura) não entram no digest
+            if not is_ignored(relative_path, patterns) and os.path.isfile(os.path.join(root, filename)):
+                files.append(relative_path)
+    return files
+
+
+def hash_build_context(context_path, dockerfile='Dockerfile', extra=()):
+    """
+    Digest do contexto de build do Docker: arquivos do contexto (respeitando o
+    .dockerignore), o Dockerfile e os valores em `extra` (ex.: versão do pacote).
+    """
+    files = set(build_context_files(context_path))
+    if os.path.isfile(os.path.join(context_path, dockerfile)):
+        files.add(dockerfile)  # O Dockerfile é enviado mesmo se estiver no .dockerignore
+    return hash_files(context_path, files, extra=extra)
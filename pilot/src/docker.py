@@ -1,13 +1,46 @@
 # pilot\src\docker.py
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from pilot.base.manager import BaseManager
+from pilot.src.config import Config
+from pilot.src.digest import hash_build_context
 from pilot.src.log import Logger
 
+BUILD_DIGEST_LABEL = 'pilot.build-digest'
+# Secret do BuildKit com a URL do CodeArtifact e a variável de ambiente de onde ele é lido
+CODEARTIFACT_SECRET_ID = 'codeartifact_url'
+CODEARTIFACT_URL_ENV = 'CODEARTIFACT_REPOSITORY_URL'
+# Dockerfile antigo, que recebe a URL por `ARG` em vez do secret
+CODEARTIFACT_ARG = re.compile(rf'^\s*ARG\s+{CODEARTIFACT_URL_ENV}\b', re.IGNORECASE | re.MULTILINE)
+# Builder criado pelo pilot quando o cache precisa ser exportado (o driver `docker` não exporta)
+DEFAULT_BUILDX_BUILDER = 'pilot'
+
+# Um lock por contexto docker: alvos em paralelo no mesmo daemon disputam tags e builders
+_build_locks = {}
+_build_locks_guard = threading.Lock()
+
 class DockerManager(BaseManager):
 
-    def __init__(self):
+    def __init__(self, docker_context=None):
         super().__init__()
         self.section_name = 'docker'
         self.log_mng = Logger()
+        # Com um contexto definido, os comandos usam `docker --context` em vez do contexto global
+        self.docker_context = docker_context
+
+    @property
+    def docker(self):
+        """Prefixo dos comandos docker deste manager."""
+        return f"docker --context {self.docker_context}" if self.docker_context else "docker"
+
+    def build_lock(self):
+        """Lock compartilhado pelos builds no mesmo contexto docker deste processo."""
+        with _build_locks_guard:
+            return _build_locks.setdefault(self.docker_context or '', threading.Lock())
 
     def init(self, **kwargs):
         """Inicializa a sessão 'docker' no arquivo de configuração."""
@@ -48,32 +81,125 @@ class DockerManager(BaseManager):
 
     def remover_imagem(self, image_name, version):
         self.log_mng.info(f"Removendo imagem.")
-        self.ctx.run(f"docker rmi -f {image_name}:{version}")
+        self.ctx.run(f"{self.docker} rmi -f {image_name}:{version}")
 
     def verificar_existencia_imagem(self, image_name, version):
         self.log.info(f'Verificando a existência da imagem {image_name}:{version}...')
-        result = self.ctx.run(f"docker images -q {image_name}:{version}")
+        result = self.ctx.run(f"{self.docker} images -q {image_name}:{version}")
         return bool(result.stdout.strip())
 
-    def build_docker_image(self, dockerfile_path, image_name, package_version, codeartifact_url):
+    def image_id(self, image_name, version):
+        """ID completo (sha256:...) da imagem local `image_name:version`, ou None se ela não existir."""
+        result = self.ctx.run(f"{self.docker} images -q --no-trunc {image_name}:{version}")
+        lines = result.stdout.split() if result.ok else []
+        return lines[0] if lines else None
+
+    def calcular_digest_build(self, dockerfile_path, package_version):
+        """Digest do contexto de build + Dockerfile + versão do pacote."""
+        start = time.perf_counter()
+        digest = hash_build_context(dockerfile_path, extra=(package_version,))
+        self.log.info(f"Digest do build calculado em {time.perf_counter() - start:.2f}s: {digest[:12]}")
+        return digest
+
+    def imagem_com_digest(self, image_name, version, digest):
+        """Verifica se a imagem local já foi construída a partir do mesmo digest."""
+        result = self.ctx.run(
+            f"{self.docker} images -q --filter label={BUILD_DIGEST_LABEL}={digest} {image_name}:{version}"
+        )
+        return bool(result.stdout.strip())
 
+    def dockerfile_uses_build_arg(self, dockerfile_path):
+        """True se o Dockerfile do contexto declara `ARG CODEARTIFACT_REPOSITORY_URL`."""
+        try:
+            with open(os.path.join(dockerfile_path, 'Dockerfile'), 'r', encoding='utf-8') as f:
+                return bool(CODEARTIFACT_ARG.search(f.read()))
+        except OSError:
+            return False
+
+    def ensure_buildx_builder(self, name):
+        """Garante um builder buildx com driver `docker-container` (necessário para `--cache-to`)."""
+        if self.ctx.run(self.docker.split() + ['buildx', 'inspect', name]).ok:
+            return True
+        self.log.info(f"Criando o builder buildx '{name}' (driver docker-container)...")
+        command = self.docker.split() + ['buildx', 'create', '--name', name, '--driver', 'docker-container']
+        if self.docker_context:
+            command.append(self.docker_context)  # Endpoint do builder: o mesmo contexto dos comandos
+        result = self.ctx.run(command)
+        if result.ok:
+            return True
+        # Outro processo pode ter criado o mesmo builder entre o inspect e o create
+        if self.ctx.run(self.docker.split() + ['buildx', 'inspect', name]).ok:
+            return True
+        self.log.error(f"Não foi possível criar o builder buildx '{name}': {result.stderr}")
+        return False
+
+    def build_docker_image(self, dockerfile_path, image_name, package_version, codeartifact_url, labels=None,
+                           cache_from=None, cache_to=None, url_as_build_arg=False, builder=None):
+        """
+        Builda a imagem com BuildKit.
+
+        A URL do CodeArtifact (que carrega um token temporário) vai como secret
+        `codeartifact_url`, lida da variável de ambiente do processo: ela não entra
+        na chave de cache das camadas nem no histórico da imagem. No Dockerfile:
+
+            RUN --mount=type=secret,id=codeartifact_url \
+                PIP_EXTRA_INDEX_URL=$(cat /run/secrets/codeartifact_url) pip install ...
+
+        `url_as_build_arg` mantém o `--build-arg CODEARTIFACT_REPOSITORY_URL` para
+        Dockerfiles antigos (invalida o cache do pip a cada token novo); ele também
+        é passado, com um aviso, quando o Dockerfile ainda declara esse `ARG`.
+        `cache_from`/`cache_to` (ex.: `type=registry,ref=<repo>:buildcache`) usam
+        `docker buildx build --load` para compartilhar camadas entre hosts. O
+        driver `docker` não exporta cache, então com `cache_to` o build roda no
+        `builder` informado (ou em 'pilot[-<contexto>]'), criado se ainda não existir.
+        """
         try:
             self.log.info("Buildando a imagem Docker...")
 
-            # Construir o comando Docker
-            command = (
-                f"docker build --build-arg CODEARTIFACT_REPOSITORY_URL={codeartifact_url} "
-                f"-t {image_name}:{package_version} {dockerfile_path}"
+            if not url_as_build_arg and self.dockerfile_uses_build_arg(dockerfile_path):
+                self.log.warning(
+                    f"O Dockerfile declara 'ARG {CODEARTIFACT_URL_ENV}': a URL do CodeArtifact será passada "
+                    f"também como --build-arg, o que invalida o cache do pip a cada token. Para aproveitar o "
+                    f"cache, use 'RUN --mount=type=secret,id={CODEARTIFACT_SECRET_ID}' no Dockerfile."
+                )
+                url_as_build_arg = True
+
+            if cache_to and not builder:
+                # Builders são globais no buildx: um por contexto, cada um apontando para o seu
+                builder = f"{DEFAULT_BUILDX_BUILDER}-{self.docker_context}" if self.docker_context else DEFAULT_BUILDX_BUILDER
+            if builder and not self.ensure_buildx_builder(builder):
+                return
+
+            command = self.docker.split()
+            command += ['buildx', 'build', '--load'] if cache_from or cache_to or builder else ['build']
+            if builder:
+                command += ['--builder', builder]
+            command += ['--secret', f'id={CODEARTIFACT_SECRET_ID},env={CODEARTIFACT_URL_ENV}']
+            if url_as_build_arg:
+                command += ['--build-arg', CODEARTIFACT_URL_ENV]  # Valor vem do ambiente, fora da linha de comando
+            if cache_from:
+                command += ['--cache-from', cache_from]
+            if cache_to:
+                command += ['--cache-to', cache_to]
+            for key, value in (labels or {}).items():
+                command += ['--label', f'{key}={value}']
+            command += ['-t', f'{image_name}:{package_version}', str(dockerfile_path)]
+
+            # Executar o comando usando o contexto, exibindo o progresso do build conforme ele acontece
+            start = time.perf_counter()
+            result = self.ctx.run(
+                command, stream=True, log_file=self._stream_log_file('build', image_name, package_version),
+                env={'DOCKER_BUILDKIT': '1', CODEARTIFACT_URL_ENV: codeartifact_url},
             )
-            
-            # Executar o comando usando o contexto
-            result = self.ctx.run(command)
-            
+
             if result.ok:
-                self.log.info(f"Imagem Docker {image_name}:{package_version} criada com sucesso.")
+                self.log.info(
+                    f"Imagem Docker {image_name}:{package_version} criada com sucesso "
+                    f"em {time.perf_counter() - start:.1f}s."
+                )
             else:
                 self.log.error(f"Erro ao buildar a imagem Docker: {result.stderr}")
-        
+
         except Exception as e:
             self.log.error(f"Erro durante o processo de build da imagem Docker: {e}")
 
@@ -85,7 +211,7 @@ class DockerManager(BaseManager):
         self.log.info(f"Tagueando a imagem '{source_image}:{source_tag}' com as tags: {', '.join(target_tags)}")
         try:
             for target_tag in target_tags:
-                command = f"docker tag {source_image}:{source_tag} {target_image}:{target_tag}"
+                command = f"{self.docker} tag {source_image}:{source_tag} {target_image}:{target_tag}"
                 result = self.ctx.run(command)
 
                 if result.return_code == 0:
@@ -96,5 +222,70 @@ class DockerManager(BaseManager):
         except Exception as e:
             self.log.error(f"Erro inesperado ao taguear a imagem '{source_image}:{source_tag}' com múltiplas tags: {str(e)}")
 
+    def push_image(self, image, tag):
+        """Faz o push de uma tag e retorna o tempo gasto em segundos."""
+        start = time.perf_counter()
+        result = self.ctx.run(
+            f"{self.docker} push {image}:{tag}",
+            stream=True,
+            on_line=self._push_line_printer(tag),
+            log_file=self._stream_log_file('push', image, tag),
+        )
+        elapsed = time.perf_counter() - start
+
+        if not result.ok:
+            raise RuntimeError(f"Falha no push de {image}:{tag}: {result.stderr.strip()}")
+
+        self.log.info(f"Push de {image}:{tag} concluído em {elapsed:.1f}s.")
+        return elapsed
+
+    def _push_line_printer(self, tag):
+        """Prefixa as linhas de progresso com a tag, já que vários pushes podem rodar juntos."""
+        if Config().section('context').get('verbosity', 'vv') == 'v':
+            return None
+        return lambda line, _: print(f"[{tag}] {line}", flush=True)
+
+    def _stream_log_file(self, kind, image, tag):
+        """Caminho do log .gz do comando, se `log_dir` estiver configurado na seção 'docker'."""
+        log_dir = self.settings.get('log_dir', '')
+        if not log_dir:
+            return None
+        os.makedirs(log_dir, exist_ok=True)
+        safe_name = f"{image}-{tag}".replace('/', '_').replace(':', '_')
+        return os.path.join(log_dir, f"{safe_name}-{kind}.log.gz")
+
+    def push_images(self, image, tags, max_workers=2, registry_client=None):
+        """
+        Envia todas as tags de uma imagem e retorna os tempos por tag.
+
+        Sem `registry_client`, as tags são enviadas em paralelo (até `max_workers`).
+        Com ele, apenas a primeira tag é enviada via `docker push` e as demais são
+        criadas no registry a partir do manifest já enviado, sem reenviar layers.
+        """
+        tags = list(dict.fromkeys(tags))  # Remove tags repetidas mantendo a ordem
+        timings = {}
+        start = time.perf_counter()
+
+        if registry_client:
+            first_tag, other_tags = tags[0], tags[1:]
+            timings[first_tag] = self.push_image(image, first_tag)
+
+            repository = image.split('/', 1)[1]
+            for tag in other_tags:
+                tag_start = time.perf_counter()
+                registry_client.retag(repository, first_tag, tag)
+                timings[tag] = time.perf_counter() - tag_start
+                self.log.info(f"Tag {image}:{tag} criada no registry em {timings[tag]:.1f}s.")
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tags)))) as executor:
+                futures = {tag: executor.submit(self.push_image, image, tag) for tag in tags}
+                for tag, future in futures.items():
+                    timings[tag] = future.result()
+
+        total = time.perf_counter() - start
+        summary = ', '.join(f"{tag}: {elapsed:.1f}s" for tag, elapsed in timings.items())
+        self.log.info(f"Push de {image} finalizado em {total:.1f}s ({summary}).")
+        return timings
+
     def update(self, **kwargs):
         raise NotImplementedError
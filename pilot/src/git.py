@@ -1,10 +1,18 @@
 # pilot/src/git.py
 import os
+import re
+import time
 import platform
 from pathlib import Path
 from shutil import copyfile, copytree
 
 from pilot.base.manager import BaseManager
+from pilot.default.git import GIT_DEFAULTS
+from pilot.src.context import STOP_STREAM
+
+# Só tags de release no formato vMAJOR.MINOR.PATCH entram no cálculo da próxima versão
+SEMVER_TAG = re.compile(r'^v(\d+)\.(\d+)\.(\d+)$')
+RELEASE_TAG_PATTERN = 'refs/tags/v[0-9]*'
 
 class GitManager(BaseManager):
 
@@ -12,6 +20,7 @@ class GitManager(BaseManager):
         super().__init__()
         self.section_name = 'git'
         self.default_section = 'default_git'
+        self.defaults = GIT_DEFAULTS
         self.repo_path = Path(repo_path).resolve() if repo_path else None
         self.hooks_path = None
         self.os_type = platform.system().lower()
@@ -56,22 +65,63 @@ class GitManager(BaseManager):
             copyfile(script, dest_path)
             os.chmod(dest_path, 0o755)  # Permissão de execução
 
+    def status_command(self):
+        """`git status` em formato porcelain v2 separado por NUL, com os aceleradores opcionais."""
+        command = ['git']
+        if self.settings.getboolean('fast_status'):
+            # Cache de diretórios não rastreados + daemon de fsmonitor (quando suportado pela plataforma)
+            command += ['-c', 'core.untrackedCache=true', '-c', 'core.fsmonitor=true']
+        return command + ['status', '--porcelain=v2', '-z']
+
+    def conta_mudancas(self, limit=None):
+        """
+        Conta as mudanças do `git status`, lendo a saída em streaming.
+
+        Com `limit`, o git é encerrado assim que a contagem passar do limite.
+        Retorna `(mudanças, interrompido, resultado)`.
+        """
+        state = {'count': 0, 'skip_next': False}
+
+        def on_record(record, name):
+            if name != 'stdout' or not record:
+                return None
+            if state['skip_next']:
+                state['skip_next'] = False  # Caminho de origem de um rename/cópia
+                return None
+            kind = record[0]
+            if kind == '2':
+                state['skip_next'] = True
+            if kind in '12u?':
+                state['count'] += 1
+                if limit is not None and state['count'] > limit:
+                    return STOP_STREAM
+            return None
+
+        result = self.ctx.run(self.status_command(), stream=True, on_line=on_record, separator='\0', tail_lines=1)
+        return state['count'], result.stopped, result
+
     def verifica_mudanca(self):
         """Verifica a quantidade de mudanças, sugere um commit e interrompe se não houver mudanças."""
+        threshold = self.settings.getint('change_threshold')
 
-        # Verifica se há modificações no repositório
-        status_result = self.ctx.run("git status --porcelain")
-        changed_files = status_result.stdout.strip()
+        # Verifica se há modificações no repositório (para de ler ao passar do limiar)
+        start = time.perf_counter()
+        num_changes, stopped, status_result = self.conta_mudancas(limit=threshold)
+        elapsed = time.perf_counter() - start
+        summary = f"mais de {threshold}" if stopped else str(num_changes)
+        self.log.info(f"git status: {summary} mudança(s) em {elapsed:.3f}s")
 
-        if not changed_files:
-            self.log.info("Nenhuma modificação detectada. Nenhum commit será realizado.")
+        if not status_result.ok:
+            self.log.error(f"Erro ao verificar as mudanças: {status_result.stderr}")
             return False
 
-        num_changes = len(changed_files.splitlines())
+        if not num_changes:
+            self.log.info("Nenhuma modificação detectada. Nenhum commit será realizado.")
+            return False
 
         # Sugere fazer um commit se houver um número considerável de mudanças
-        if num_changes > 10:  # Defina o limiar de sua escolha
-            self.log.warning(f"Você tem {num_changes} arquivos modificados. Considere fazer commits menores.")
+        if num_changes > threshold:
+            self.log.warning(f"Você tem {summary} arquivos modificados. Considere fazer commits menores.")
 
         return True
 
@@ -87,15 +137,35 @@ class GitManager(BaseManager):
             else:
                 self.log.error("Tipo de alteração inválido. Por favor, escolha 1, 2 ou 3.")
 
+    def ultima_tag_semantica(self):
+        """
+        Retorna a maior tag vMAJOR.MINOR.PATCH do repositório (ou None).
+
+        O git ordena as tags por versão e a saída é lida em streaming até a
+        primeira tag válida, então tags fora do padrão (rc, nomes livres) são
+        puladas sem ler a lista inteira.
+        """
+        found = {}
+
+        def on_tag(tag, name):
+            if name == 'stdout' and SEMVER_TAG.match(tag):
+                found['tag'] = tag
+                return STOP_STREAM
+            return None
+
+        result = self.ctx.run(
+            ['git', 'for-each-ref', '--sort=-v:refname', '--format=%(refname:short)', RELEASE_TAG_PATTERN],
+            stream=True, on_line=on_tag, tail_lines=1,
+        )
+        if not result.ok:
+            raise RuntimeError(f"Não foi possível listar as tags: {result.stderr}")
+        return found.get('tag')
+
     def cria_tag_semantica(self, severity):
-        """Cria uma tag de versão semântica com base na severidade."""
+        """Cria uma tag de versão semântica com base na severidade e envia commit e tag num único push atômico."""
         try:
-            # Primeiro, tenta obter a última tag usando o comando git tag
-            result = self.ctx.run("git tag --sort=-v:refname")
-            tags = result.stdout.strip().splitlines()
-            last_tag = tags[0] if tags else "v0.0.0"
-
-            major, minor, patch = map(int, last_tag.lstrip('v').split('.'))
+            last_tag = self.ultima_tag_semantica() or "v0.0.0"
+            major, minor, patch = map(int, SEMVER_TAG.match(last_tag).groups())
 
             # Atualiza a versão com base na severidade
             if severity == 'major':
@@ -109,8 +179,17 @@ class GitManager(BaseManager):
                 patch += 1
 
             new_tag = f"v{major}.{minor}.{patch}"
-            self.ctx.run(f'git tag -a \"{new_tag}\" -m \"Release version {new_tag}\"')
-            self.ctx.run(f"git push origin {new_tag}")
+            result = self.ctx.run(['git', 'tag', '-a', new_tag, '-m', f"Release version {new_tag}"])
+            if not result.ok:
+                self.log.error(f"Erro ao criar a tag {new_tag}: {result.stderr}")
+                return
+
+            # Commit e tag vão juntos: ou o remoto recebe os dois, ou nenhum
+            result = self.ctx.run(['git', 'push', '--atomic', 'origin', 'HEAD', f"refs/tags/{new_tag}"])
+            if not result.ok:
+                self.ctx.run(['git', 'tag', '-d', new_tag])  # Permite repetir o release depois
+                self.log.error(f"Erro ao enviar commit e tag {new_tag}: {result.stderr}")
+                return
             self.log.info(f"Tag {new_tag} criada e enviada com sucesso.")
         except Exception as e:
             self.log.error(f"Erro ao criar tag semântica: {str(e)}")
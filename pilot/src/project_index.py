@@ -0,0 +1,138 @@
+# pilot/src/project_index.py
+import os
+import fnmatch
+import shutil
+import posixpath
+from pathlib import Path
+
+from pilot.src.context import Context
+
+# Diretórios que nunca fazem parte do código do projeto
+IGNORED_DIRS = {
+    '.git', '.hg', '.svn', '.venv', 'venv', 'env', 'node_modules', '__pycache__',
+    '.tox', '.nox', '.mypy_cache', '.pytest_cache', '.ruff_cache', 'site-packages',
+}
+
+
+class GitignoreMatcher:
+    """Subconjunto das regras do .gitignore (padrões, âncoras, `dir/` e negação com `!`)."""
+
+    def __init__(self, lines):
+        self.rules = []
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            pattern = line[1:] if negate else line
+            dir_only = pattern.endswith('/')
+            pattern = pattern.rstrip('/')
+            anchored = '/' in pattern  # Barra no início ou no meio ancora o padrão na raiz
+            pattern = pattern.lstrip('/')
+            self.rules.append((pattern, negate, dir_only, anchored))
+
+    @classmethod
+    def from_file(cls, path):
+        try:
+            return cls(Path(path).read_text(encoding='utf-8').splitlines())
+        except OSError:
+            return cls([])
+
+    def ignored(self, relative_path, is_dir):
+        result = False
+        name = posixpath.basename(relative_path)
+        for pattern, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            target = relative_path if anchored else name
+            if fnmatch.fnmatch(target, pattern):
+                result = not negate
+        return result
+
+
+class ProjectIndex:
+    """
+    Índice dos arquivos do projeto, montado com uma única varredura.
+
+    Usa `git ls-files` quando o projeto está num repositório; caso contrário,
+    percorre a árvore podando diretórios ignorados (.gitignore, virtualenvs,
+    node_modules...). Use `ProjectIndex.for_root` para compartilhar o mesmo
+    índice entre managers.
+    """
+
+    _instances = {}
+
+    def __init__(self, root, ctx=None):
+        self.root = Path(root).resolve()
+        self.ctx = ctx or Context()
+        self._files = None
+
+    @classmethod
+    def for_root(cls, root):
+        root = Path(root).resolve()
+        if root not in cls._instances:
+            cls._instances[root] = cls(root)
+        return cls._instances[root]
+
+    @property
+    def files(self):
+        """Caminhos relativos (estilo posix) de todos os arquivos do projeto."""
+        if self._files is None:
+            files = self._git_files()
+            if files is None:
+                files = self._walk_files()
+            self._files = sorted(f for f in files if not self._in_ignored_dir(f))
+        return self._files
+
+    def invalidate(self):
+        self._files = None
+
+    @staticmethod
+    def _in_ignored_dir(relative_path):
+        return any(part in IGNORED_DIRS for part in relative_path.split('/')[:-1])
+
+    def _git_files(self):
+        inside_repo = any((path / '.git').exists() for path in (self.root, *self.root.parents))
+        if not inside_repo or not shutil.which('git'):
+            return None
+        result = self.ctx.run(
+            ['git', '-C', str(self.root), 'ls-files', '--cached', '--others', '--exclude-standard', '-z']
+        )
+        if not result.ok:
+            return None
+        # O índice do git ainda lista arquivos apagados da árvore e gitlinks de submódulos
+        return [
+            path for path in result.stdout.split('\0')
+            if path and os.path.isfile(self.root / path)
+        ]
+
+    def _walk_files(self):
+        matcher = GitignoreMatcher.from_file(self.root / '.gitignore')
+        files = []
+        for root, dirs, filenames in os.walk(self.root):
+            relative_root = os.path.relpath(root, self.root).replace(os.sep, '/')
+            relative_root = '' if relative_root == '.' else relative_root + '/'
+
+            dirs[:] = [
+                d for d in dirs
+                if d not in IGNORED_DIRS
+                and not d.endswith('.egg-info')
+                and not os.path.exists(os.path.join(root, d, 'pyvenv.cfg'))
+                and not matcher.ignored(relative_root + d, is_dir=True)
+            ]
+            files.extend(
+                relative_root + filename for filename in filenames
+                if not matcher.ignored(relative_root + filename, is_dir=False)
+            )
+        return files
+
+    def glob(self, pattern):
+        """Arquivos cujo caminho relativo casa com o padrão (fnmatch, `*` atravessa diretórios)."""
+        return [self.root / path for path in self.files if fnmatch.fnmatch(path, pattern)]
+
+    def find_first(self, filename):
+        """O arquivo com esse nome mais próximo da raiz (desempate alfabético), ou None."""
+        matches = [path for path in self.files if posixpath.basename(path) == filename]
+        if not matches:
+            return None
+        return self.root / min(matches, key=lambda path: (path.count('/'), path))
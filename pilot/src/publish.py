@@ -1,58 +1,187 @@
+# pilot/src/publish.py
 import os
+import sys
+import time
+import base64
+import tomllib
+import hashlib
+from pathlib import Path
+from html.parser import HTMLParser
+from urllib.error import HTTPError
+from urllib.parse import unquote, urljoin, urlparse
+from urllib.request import Request, urlopen
+from concurrent.futures import ThreadPoolExecutor
 
 from pilot.base.manager import BaseManager
-from pilot.src.git import GitManager
-# from pilot.src.build import BuildManager #type:ignore ← NÃO EXISTE
+from pilot.default.publish import PUBLISH_DEFAULTS
+from pilot.src.build import BuildManager
+from pilot.src.cache import get_cache_dir, read_json, write_json_atomic
+from pilot.src.workspace import normalize_name
+
+
+class _LinkParser(HTMLParser):
+    """Extrai os nomes de arquivo dos links de uma página do índice simple (PEP 503)."""
+
+    def __init__(self):
+        super().__init__()
+        self.files = set()
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            href = dict(attrs).get('href') or ''
+            # O índice pode codificar o nome (ex.: '%2B' no '+' de versões locais)
+            filename = unquote(urlparse(href).path.rsplit('/', 1)[-1])
+            if filename:
+                self.files.add(filename)
+
 
 class PublishManager(BaseManager):
+    """
+    Publica o pacote do projeto: build (com cache), consulta única do índice
+    para descobrir o que já foi publicado e upload concorrente do restante.
+
+    Funciona com o CodeArtifact (padrão) ou com qualquer repositório compatível
+    com o PyPI configurado em `repository_url` (ex.: um pypiserver local).
+    """
+
     def __init__(self, project_path='.'):
         super().__init__()
+        self.section_name = 'publish'
+        self.default_section = 'default_publish'
+        self.defaults = PUBLISH_DEFAULTS
         self.project_path = os.path.abspath(project_path)
-        self.git_manager = GitManager(self.project_path)
-        # self.build_manager = BuildManager()
-
-    def init(self):
-        """Inicializa a seção 'log' no arquivo de configuração."""
-        if not self.config.has_section(self.section_name):
-            
-            self.config.add_section(self.section_name)
-            
-            for key, default_value in LOG_DEFAULTS.items():
-                self.config.set(self.section_name, key, self.config.get(self.section_name, key, fallback=default_value))
-            
-            self.save_config()
-
-    def publish_package(self, ctx):
-        try:
-            self.log.info("Publishing Package on CodeArtifact...")
+        self.build_manager = BuildManager()
+        self._aws_manager = None
 
-            # Build
-            self.build_manager.build(ctx, project_path=self.project_path)
+    def init(self, **kwargs):
+        """Inicializa a seção 'publish' no arquivo de configuração."""
+        self.init_section(PUBLISH_DEFAULTS, **kwargs)
 
-            # Carregar as configurações do projeto
-            project_config = self.get_project_config(self.project_path)
-            project_name = project_config['project_name']
-            project_version = project_config['version']
+        self.save_config()
 
-            # Autenticar no CodeArtifact para client twine
-            self.authenticate_codeartifact(ctx, project_config)
+    def update(self, **kwargs):
+        raise NotImplementedError
 
-            # Publicar o pacote no CodeArtifact usando twine
-            self.upload_to_codeartifact(ctx)
+    @property
+    def aws_manager(self):
+        if self._aws_manager is None:
+            from pilot.src.aws import AWSManager
+            self._aws_manager = AWSManager()
+        return self._aws_manager
 
-            self.log.info(f"Package {project_name} was successfully published on version {project_version}")
+    def project_name(self):
+        with open(os.path.join(self.project_path, 'pyproject.toml'), 'rb') as f:
+            return tomllib.load(f)['project']['name']
 
-        except Exception as e:
-            self.log.error(f"Error during publishing process: {e}")
-
-    def authenticate_codeartifact(self, ctx, project_config):
-        ctx.run(
-            f"aws codeartifact login --tool twine --repository {project_config['codeartifact_repository']} "
-            f"--domain {project_config['codeartifact_domain']} --domain-owner {project_config['aws_account_id']} "
-            f"--region {project_config['aws_default_region']}", 
-            echo=True
+    def repository(self):
+        """Retorna `(url de upload, url do índice simple, usuário, senha)`."""
+        upload_url = self.settings.get('repository_url')
+        username = self.settings.get('username')
+        password = os.environ.get('TWINE_PASSWORD', '')
+        if not upload_url:
+            aws = self.config['aws']
+            upload_url = f"https://{self.aws_manager.get_codeartifact_endpoint()}/pypi/{aws['codeartifact_repository']}/"
+            username = username or 'aws'
+            password = password or self.aws_manager.get_codeartifact_token()
+
+        upload_url = upload_url.rstrip('/') + '/'
+        index_url = (self.settings.get('index_url') or urljoin(upload_url, 'simple/')).rstrip('/') + '/'
+        return upload_url, index_url, username, password
+
+    def _index_cache_file(self, index_url, project):
+        key = hashlib.sha256(f"{index_url}|{project}".encode('utf-8')).hexdigest()[:16]
+        return get_cache_dir('publish') / f"index-{key}.json"
+
+    def published_files(self, index_url, project, username='', password='', refresh=False):
+        """
+        Arquivos já publicados do projeto, com uma única requisição ao índice simple.
+
+        O resultado fica em cache por `index_cache_seconds`; uploads feitos pelo
+        pilot atualizam o cache, então ciclos seguidos não repetem a consulta.
+        """
+        cache_file = self._index_cache_file(index_url, project)
+        cached = read_json(cache_file, default={})
+        ttl = self.settings.getint('index_cache_seconds')
+        if not refresh and cached and time.time() - cached.get('fetched_at', 0) < ttl:
+            return set(cached['files'])
+
+        request = Request(urljoin(index_url, f"{normalize_name(project)}/"))
+        if username or password:
+            credentials = base64.b64encode(f"{username}:{password}".encode('utf-8')).decode('ascii')
+            request.add_header('Authorization', f"Basic {credentials}")
+        try:
+            with urlopen(request, timeout=30) as response:
+                parser = _LinkParser()
+                parser.feed(response.read().decode('utf-8', errors='replace'))
+                files = parser.files
+        except HTTPError as e:
+            if e.code != 404:
+                raise
+            files = set()  # Projeto ainda não publicado
+
+        write_json_atomic(cache_file, {'fetched_at': time.time(), 'files': sorted(files)})
+        return files
+
+    def _remember_uploads(self, index_url, project, filenames):
+        cache_file = self._index_cache_file(index_url, project)
+        cached = read_json(cache_file, default=None)
+        if cached:
+            cached['files'] = sorted(set(cached['files']) | set(filenames))
+            write_json_atomic(cache_file, cached)
+
+    def upload_file(self, path, upload_url, username, password):
+        """Envia um artefato com o twine e retorna o tempo gasto em segundos."""
+        start = time.perf_counter()
+        env = {**os.environ, 'TWINE_USERNAME': username, 'TWINE_PASSWORD': password}
+        result = self.ctx.run(
+            [sys.executable, '-m', 'twine', 'upload', '--non-interactive', '--skip-existing',
+             '--repository-url', upload_url, str(path)],
+            env=env,
         )
+        if not result.ok:
+            raise RuntimeError(result.stderr.strip() or result.stdout.strip())
+        return time.perf_counter() - start
 
-    def upload_to_codeartifact(self, ctx):
-        ctx.run("twine upload --repository codeartifact dist/*", echo=True)
+    def publish_package(self):
+        """Builda e publica o pacote; retorna True se nenhum upload falhou."""
+        try:
+            self.log.info("Publicando o pacote...")
+            artifacts = self.build_manager.build(self.project_path)
+            if not artifacts:
+                self.log.error("Nenhum artefato gerado pelo build. Publicação cancelada.")
+                return False
+
+            project = self.project_name()
+            upload_url, index_url, username, password = self.repository()
+            published = self.published_files(index_url, project, username, password)
+
+            pending = [path for path in artifacts if Path(path).name not in published]
+            for path in artifacts:
+                if path not in pending:
+                    self.log.info(f"Já publicado, ignorando: {Path(path).name}")
+            if not pending:
+                self.log.info(f"Nada a publicar: todos os artefatos de {project} já estão no repositório.")
+                return True
 
+            workers = max(1, min(self.settings.getint('upload_workers'), len(pending)))
+            self.log.info(f"Enviando {len(pending)} artefato(s) para {upload_url} ({workers} em paralelo)...")
+            uploaded, failed = [], []
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self.upload_file, path, upload_url, username, password): path for path in pending}
+                for future, path in futures.items():
+                    try:
+                        elapsed = future.result()
+                        uploaded.append(Path(path).name)
+                        self.log.info(f"Enviado: {Path(path).name} em {elapsed:.1f}s")
+                    except Exception as e:
+                        failed.append(Path(path).name)
+                        self.log.error(f"Falha no upload de {Path(path).name}: {e}")
+
+            self._remember_uploads(index_url, project, uploaded)
+            skipped = len(artifacts) - len(pending)
+            self.log.info(f"Publicação de {project}: {len(uploaded)} enviado(s), {skipped} ignorado(s), {len(failed)} com falha.")
+            return not failed
+
+        except Exception as e:
+            self.log.error(f"Erro durante o processo de publicação: {e}")
+            return False
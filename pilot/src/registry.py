@@ -0,0 +1,53 @@
+# pilot/src/registry.py
+import base64
+import urllib.request
+
+MANIFEST_MEDIA_TYPES = (
+    'application/vnd.oci.image.index.v1+json',
+    'application/vnd.docker.distribution.manifest.list.v2+json',
+    'application/vnd.docker.distribution.manifest.v2+json',
+    'application/vnd.oci.image.manifest.v1+json',
+)
+
+
+class RegistryClient:
+    """
+    Cliente mínimo da Registry HTTP API v2 (ECR, registry:2, etc.).
+
+    Serve para adicionar tags do lado do registry: o manifest de uma tag já
+    enviada é lido e regravado com a nova tag, sem reenviar nenhuma layer.
+    """
+
+    def __init__(self, registry, username=None, password=None, timeout=30):
+        self.registry = registry
+        self.timeout = timeout
+        self.scheme = 'http' if registry.split(':')[0] in ('localhost', '127.0.0.1') else 'https'
+        self.auth_header = None
+        if username is not None:
+            credentials = base64.b64encode(f"{username}:{password}".encode('utf-8')).decode('ascii')
+            self.auth_header = f"Basic {credentials}"
+
+    def _request(self, method, url, data=None, headers=None):
+        request = urllib.request.Request(url, data=data, method=method, headers=headers or {})
+        if self.auth_header:
+            request.add_header('Authorization', self.auth_header)
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    def _manifest_url(self, repository, reference):
+        return f"{self.scheme}://{self.registry}/v2/{repository}/manifests/{reference}"
+
+    def get_manifest(self, repository, reference):
+        """Retorna `(manifest, media_type)` da referência informada."""
+        headers = {'Accept': ', '.join(MANIFEST_MEDIA_TYPES)}
+        with self._request('GET', self._manifest_url(repository, reference), headers=headers) as response:
+            return response.read(), response.headers.get('Content-Type')
+
+    def put_manifest(self, repository, tag, manifest, media_type):
+        headers = {'Content-Type': media_type}
+        with self._request('PUT', self._manifest_url(repository, tag), data=manifest, headers=headers) as response:
+            return response.status
+
+    def retag(self, repository, source_tag, target_tag):
+        """Aponta `target_tag` para o mesmo manifest de `source_tag`."""
+        manifest, media_type = self.get_manifest(repository, source_tag)
+        self.put_manifest(repository, target_tag, manifest, media_type)
@@ -0,0 +1,78 @@
+# pilot/src/token_cache.py
+import time
+from datetime import datetime
+
+from pilot.src.cache import get_cache_dir, read_json, write_json_atomic
+from pilot.src.lock import FileLock
+
+# Tokens com menos que isso de validade são renovados antes de serem usados
+REFRESH_MARGIN_SECONDS = 300
+
+
+def parse_expiration(value):
+    """Converte a expiração devolvida pela AWS (ISO 8601 ou epoch) em epoch."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+
+class TokenCache:
+    """
+    Cache de tokens do CodeArtifact, em memória e em disco (0600).
+
+    As entradas são chaveadas por domínio, dono e região. O acesso ao arquivo
+    é serializado por um lock, então processos `pilot` concorrentes
+    compartilham o mesmo token em vez de pedir um novo cada um.
+    """
+
+    _memory = {}
+
+    def __init__(self, cache_dir=None):
+        cache_dir = cache_dir or get_cache_dir()
+        self.cache_file = cache_dir / 'codeartifact_tokens.json'
+        self.lock = FileLock(cache_dir / 'codeartifact_tokens.lock')
+
+    @staticmethod
+    def key(domain, owner, region):
+        return f"{domain}:{owner}:{region}"
+
+    @staticmethod
+    def _is_valid(entry):
+        return bool(entry) and entry.get('expires_at', 0) - REFRESH_MARGIN_SECONDS > time.time()
+
+    def get(self, domain, owner, region, fetch):
+        """
+        Retorna um token válido, chamando `fetch()` apenas se não houver um em cache.
+
+        `fetch` deve retornar a tupla `(token, expiration)`.
+        """
+        key = self.key(domain, owner, region)
+
+        entry = self._memory.get(key)
+        if self._is_valid(entry):
+            return entry['token']
+
+        with self.lock:
+            # Outro processo pode ter renovado o token enquanto esperávamos o lock
+            entries = read_json(self.cache_file, default={})
+            entry = entries.get(key)
+            if not self._is_valid(entry):
+                token, expiration = fetch()
+                entry = {'token': token, 'expires_at': parse_expiration(expiration)}
+                entries = {k: v for k, v in entries.items() if self._is_valid(v)}
+                entries[key] = entry
+                write_json_atomic(self.cache_file, entries)
+
+        self._memory[key] = entry
+        return entry['token']
+
+    def invalidate(self, domain, owner, region):
+        """Remove o token da memória e do disco (ex.: após um 401)."""
+        key = self.key(domain, owner, region)
+        self._memory.pop(key, None)
+        with self.lock:
+            entries = read_json(self.cache_file, default={})
+            if entries.pop(key, None) is not None:
+                write_json_atomic(self.cache_file, entries)
@@ -0,0 +1,130 @@
+# pilot/src/trace.py
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+from pilot.singleton import Singleton
+
+# Frames desses módulos são pulados ao identificar quem disparou um comando
+_INTERNAL_MODULES = ('pilot.src.context', 'pilot.src.trace', 'asyncio', 'concurrent', 'threading', 'contextlib')
+
+
+def describe_caller(frame):
+    """Retorna 'Classe.método' (ou 'módulo.função') do primeiro frame fora do pilot.src.context."""
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if not module.startswith(_INTERNAL_MODULES):
+            instance = frame.f_locals.get('self')
+            if instance is not None:
+                return f"{type(instance).__name__}.{frame.f_code.co_name}"
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'desconhecido'
+
+
+class Tracer(Singleton):
+    """
+    Coleta spans (comandos externos e etapas de pipeline) de uma execução do pilot.
+
+    Fica desligado por padrão; `pilot --trace arquivo.json` liga a coleta e, ao
+    final do comando, exporta os eventos no formato trace-event do Chrome/Perfetto
+    e imprime um resumo.
+    """
+
+    def _initialize(self):
+        self.enabled = False
+        self.events = []
+        self._lock = threading.Lock()
+        self._thread_ids = {}
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+        self._origin = time.perf_counter()
+
+    def now(self):
+        """Timestamp em microssegundos desde o início da coleta."""
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    def _tid(self):
+        ident = threading.get_ident()
+        with self._lock:
+            return self._thread_ids.setdefault(ident, len(self._thread_ids) + 1)
+
+    def add(self, name, category, start_us, end_us, **args):
+        """Registra um span completo (evento 'X' do trace-event)."""
+        if not self.enabled:
+            return
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': start_us,
+            'dur': max(0.0, end_us - start_us),
+            'pid': os.getpid(),
+            'tid': self._tid(),
+            'args': args,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name, category='pipeline', **args):
+        """Mede o bloco como um span; não custa nada com o tracer desligado."""
+        if not self.enabled:
+            yield
+            return
+
+        start = self.now()
+        status = 'ok'
+        try:
+            yield
+        except BaseException:
+            status = 'erro'
+            raise
+        finally:
+            self.add(name, category, start, self.now(), status=status, **args)
+
+    def export(self, path):
+        """Grava o trace em JSON (chrome://tracing / ui.perfetto.dev)."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
+
+    def finish(self, path):
+        """Exporta o trace e imprime o resumo ao final do comando."""
+        self.export(path)
+        self.print_summary()
+        print(f"Trace gravado em {path} (abra em https://ui.perfetto.dev)", file=sys.stderr)
+
+    def print_summary(self, limit=20):
+        """Imprime uma tabela com os spans mais demorados e o total por categoria."""
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="Trace do pilot")
+        table.add_column("Span")
+        table.add_column("Origem")
+        table.add_column("Duração (s)", justify="right")
+        table.add_column("Exit", justify="right")
+        table.add_column("Saída (bytes)", justify="right")
+
+        for event in sorted(self.events, key=lambda e: e['dur'], reverse=True)[:limit]:
+            args = event['args']
+            table.add_row(
+                event['name'][:60],
+                args.get('caller', args.get('pipeline', event['cat'])),
+                f"{event['dur'] / 1_000_000:.2f}",
+                str(args.get('exit_code', '')),
+                str(args.get('output_bytes', '')),
+            )
+
+        console = Console(file=sys.stderr)
+        console.print(table)
+        totals = {}
+        for event in self.events:
+            totals[event['cat']] = totals.get(event['cat'], 0) + event['dur']
+        for category, total in totals.items():
+            console.print(f"Total em '{category}': {total / 1_000_000:.2f}s")
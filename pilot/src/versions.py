@@ -0,0 +1,109 @@
+# pilot/src/versions.py
+import time
+import hashlib
+
+from packaging.version import InvalidVersion, Version
+
+from pilot.src.cache import get_cache_dir, read_json, write_json_atomic
+from pilot.src.lock import FileLock
+
+
+def parse_version(value):
+    """Version da PEP 440, ou None se a string não for uma versão válida."""
+    try:
+        return Version(value)
+    except (InvalidVersion, TypeError):
+        return None
+
+
+def latest_version(versions, allow_prereleases=False, allow_local=False):
+    """
+    Maior versão segundo a PEP 440 (post, dev, rc e local ordenados corretamente).
+
+    Pré-releases e versões de desenvolvimento (`.devN`, `rcN`...) só entram com
+    `allow_prereleases`, e versões locais (`+dirty`, builds de árvore suja) só
+    com `allow_local`; versões inválidas são ignoradas.
+    """
+    candidates = []
+    for value in versions:
+        version = parse_version(value)
+        if version is None:
+            continue
+        if version.is_prerelease and not allow_prereleases:
+            continue
+        if version.local and not allow_local:
+            continue
+        candidates.append((version, value))
+    return max(candidates)[1] if candidates else None
+
+
+def excluded_versions(versions, allow_prereleases=False, allow_local=False):
+    """Quantas versões cada filtro do `latest_version` descarta: `{'pré-release/dev': n, 'local': n, 'inválida': n}`."""
+    excluded = {'pré-release/dev': 0, 'local': 0, 'inválida': 0}
+    for value in versions:
+        version = parse_version(value)
+        if version is None:
+            excluded['inválida'] += 1
+        elif version.is_prerelease and not allow_prereleases:
+            excluded['pré-release/dev'] += 1
+        elif version.local and not allow_local:
+            excluded['local'] += 1
+    return excluded
+
+
+class VersionIndex:
+    """
+    Índice local das versões publicadas de um pacote no CodeArtifact.
+
+    A atualização é incremental: as páginas vêm do servidor das mais recentes
+    para as mais antigas e a leitura para na primeira página sem versões novas.
+    A cada `max_age` segundos o índice é refeito do zero, para refletir versões
+    que mudaram de status (ex.: arquivadas).
+    """
+
+    def __init__(self, backend, domain, owner, repository, package, region,
+                 status='Published', page_size=100, max_age=86400, cache_dir=None):
+        self.backend = backend
+        self.coordinates = (domain, owner, repository, package, region)
+        self.status = status
+        self.page_size = page_size
+        self.max_age = max_age
+
+        cache_dir = cache_dir or get_cache_dir('versions')
+        key = hashlib.sha256('|'.join((*self.coordinates, status or '')).encode('utf-8')).hexdigest()[:24]
+        self.index_file = cache_dir / f"{key}.json"
+        self.lock = FileLock(cache_dir / f"{key}.lock")
+
+    def load(self):
+        return read_json(self.index_file, default={'versions': [], 'full_sync_at': 0})
+
+    def refresh(self):
+        """Busca as versões novas e retorna `(todas as versões, novas nesta atualização)`."""
+        with self.lock:
+            index = self.load()
+            full_sync = time.time() - index.get('full_sync_at', 0) > self.max_age
+            known = set() if full_sync else set(index['versions'])
+            found = set()
+
+            pages = self.backend.iter_package_versions(
+                *self.coordinates, status=self.status, page_size=self.page_size
+            )
+            for page in pages:
+                page_versions = {entry['version'] for entry in page}
+                found |= page_versions
+                if known and page_versions <= known:
+                    break  # Daqui para trás tudo já está no índice
+
+            new_versions = found - known
+            versions = found if full_sync else known | found
+            index = {
+                'versions': sorted(versions),
+                'full_sync_at': time.time() if full_sync else index['full_sync_at'],
+                'updated_at': time.time(),
+            }
+            write_json_atomic(self.index_file, index)
+            return versions, new_versions
+
+    def latest(self, allow_prereleases=False, allow_local=False):
+        versions, _ = self.refresh()
+        return latest_version(versions, allow_prereleases, allow_local)
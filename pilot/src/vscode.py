@@ -1,8 +1,15 @@
 import os
+import sys
 import site
 import json
+import hashlib
 from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 from pilot.base.manager import BaseManager
+from pilot.default.vscode import VSCODE_EXTENSIONS
+from pilot.src.cache import get_cache_dir, read_json, write_json_atomic
+from pilot.src.project_index import ProjectIndex
 
 class VscodeManager(BaseManager):
 
@@ -14,6 +21,7 @@ class VscodeManager(BaseManager):
         self.vscode_dir = self.project_root / ".vscode"
         self.launch_file = self.vscode_dir / "launch.json"
         self.settings_file = self.vscode_dir / "settings.json"
+        self.project_index = ProjectIndex.for_root(self.project_root)
         self.ensure_vscode_directory()
 
     def init(self):
@@ -109,79 +117,117 @@ class VscodeManager(BaseManager):
 
     def find_main_py(self):
         """Finds the path to the __main__.py file in the project."""
-        for root, dirs, files in os.walk(self.project_root):
-            if "__main__.py" in files:
-                return Path(root) / "__main__.py"
-        return None
+        return self.project_index.find_first("__main__.py")
 
     def create_test_configs(self):
         """Creates launch configurations for each test file."""
         test_configs = []
-        test_dir = self.project_root / "tests"
-        for root, dirs, files in os.walk(test_dir):
-            for file in files:
-                if file.startswith("test_") and file.endswith(".py"):
-                    config = {
-                        "name": f"Test | {file}",
-                        "type": "debugpy",
-                        "request": "launch",
-                        "program": str(Path(root) / file),
-                        "console": "integratedTerminal",
-                        "justMyCode": True
-                    }
-                    test_configs.append(config)
+        for test_file in self.project_index.glob("tests/*"):
+            file = test_file.name
+            if file.startswith("test_") and file.endswith(".py"):
+                config = {
+                    "name": f"Test | {file}",
+                    "type": "debugpy",
+                    "request": "launch",
+                    "program": str(test_file),
+                    "console": "integratedTerminal",
+                    "justMyCode": True
+                }
+                test_configs.append(config)
         return test_configs
 
     def find_editable_packages_paths(self):
-        """Find paths of packages installed in editable mode."""
+        """Find paths of packages installed in editable mode.
+
+        O resultado é cacheado por ambiente e só é recalculado quando o mtime
+        de algum diretório site-packages muda (install/uninstall de pacotes).
+        """
+        site_dirs = self.get_site_packages_directories()
+        mtimes = {directory: os.stat(directory).st_mtime_ns for directory in site_dirs}
+
+        cache_file = get_cache_dir('vscode') / f"editables-{hashlib.sha256(sys.prefix.encode()).hexdigest()[:16]}.json"
+        cached = read_json(cache_file)
+        if cached and cached.get('mtimes') == mtimes:
+            return cached['paths']
+
         editable_paths = []
-        site_packages = Path(self.get_site_packages_directory())
-
-        for dist_info_dir in site_packages.glob('*.dist-info'):
-            direct_url_path = dist_info_dir / 'direct_url.json'
-            if direct_url_path.exists():
-                with open(direct_url_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    package_url = data.get('url')
-                    if package_url and package_url.startswith('file://'):
-                        package_path = package_url[len('file://'):]
-                        editable_paths.append(package_path)
-        
+        for directory in site_dirs:
+            editable_paths.extend(self._scan_editable_distributions(directory))
+        editable_paths = self.minimal_paths(editable_paths)
+
+        write_json_atomic(cache_file, {'mtimes': mtimes, 'paths': editable_paths}, mode=0o644)
         return editable_paths
 
-    def get_site_packages_directory(self):
-        """Get the site-packages directory of the current virtual environment."""
-        return next(iter(site.getsitepackages()), None)
+    def _scan_editable_distributions(self, site_packages):
+        """Lê o direct_url.json de cada *.dist-info e mantém só instalações com `dir_info.editable`."""
+        paths = []
+        with os.scandir(site_packages) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.dist-info'):
+                    continue
+                try:
+                    with open(os.path.join(entry.path, 'direct_url.json'), 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    continue
+
+                package_url = data.get('url', '')
+                if data.get('dir_info', {}).get('editable') and package_url.startswith('file://'):
+                    paths.append(url2pathname(urlparse(package_url).path))
+        return paths
+
+    @staticmethod
+    def minimal_paths(paths):
+        """Remove duplicados e caminhos contidos em outro caminho da lista."""
+        minimal = []
+        for path in sorted(set(os.path.normpath(p) for p in paths)):
+            if not any(path == kept or path.startswith(kept.rstrip(os.sep) + os.sep) for kept in minimal):
+                minimal.append(path)
+        return minimal
+
+    def get_site_packages_directories(self):
+        """Get all site-packages directories of the current environment (including the user site)."""
+        directories = list(site.getsitepackages())
+        if site.ENABLE_USER_SITE:
+            directories.append(site.getusersitepackages())
+        return [d for d in dict.fromkeys(directories) if os.path.isdir(d)]
 
     def install_extensions_and_update_vscode(self, extensions=None, update_vscode=False):
         """Instala extensões Python no VS Code e atualiza o VS Code, se necessário.
 
+        Consulta as extensões instaladas uma única vez e instala, numa única
+        chamada do `code`, só as que faltam ou cuja versão fixada (`id@versão`) difere.
+
         Args:
             extensions (list): Uma lista de IDs de extensões a serem instaladas. Se não for fornecida, serão instaladas as extensões padrão.
             update_vscode (bool): Se True, atualiza o VS Code para a última versão.
         """
         if extensions is None:
-            extensions = [
-                "ms-python.python",
-                "ms-python.vscode-pylance",
-                "ms-python.debugpy",
-                "donjayamanne.python-environment-manager",
-                "njpwerner.autodocstring",
-                "gruntfuggly.todo-tree",
-                "yzhang.markdown-all-in-one"
-            ]
-        
-        # Instala extensões fornecidas ou padrão
-        for extension in extensions:
+            extensions = self.settings.getlist('extensions', fallback=[], separator=None) or VSCODE_EXTENSIONS
+
+        installed = self.list_installed_extensions()
+        if installed is None:
+            self.log.warning("Não foi possível listar as extensões instaladas no VS Code. Todas serão instaladas.")
+            installed = {}
+
+        to_install, outdated, unchanged = self.diff_extensions(extensions, installed)
+
+        if to_install or outdated:
+            changes = to_install + outdated
+            self.log.info(f"Instalando/atualizando extensões no VS Code: {', '.join(changes)}...")
+            args = ' '.join(f"--install-extension {extension}" for extension in changes)
+            force = ' --force' if outdated else ''
             try:
-                self.log.info(f"Instalando a extensão {extension} no VS Code...")
-                result = self.ctx.run(f"code --install-extension {extension}")
-                if result.return_code == 0:
-                    self.log.info(f"Extensão {extension} instalada com sucesso.")
-                else:
-                    self.log.error(f"Erro ao instalar a extensão {extension}: {result.stderr}")
+                result = self.ctx.run(f"code {args}{force}")
+                if result.return_code != 0:
+                    self.log.error(f"Erro ao instalar extensões: {result.stderr}")
             except Exception as e:
-                self.log.error(f"Erro inesperado ao instalar a extensão {extension}: {str(e)}")
+                self.log.error(f"Erro inesperado ao instalar extensões: {str(e)}")
+
+        self.log.info(
+            f"Extensões do VS Code: {len(to_install)} instaladas, {len(outdated)} atualizadas, "
+            f"{len(unchanged)} já estavam em dia."
+        )
 
         # Atualiza o VS Code se necessário
         if update_vscode:
@@ -195,6 +241,33 @@ class VscodeManager(BaseManager):
             except Exception as e:
                 self.log.error(f"Erro inesperado ao atualizar o VS Code: {str(e)}")
 
+    def list_installed_extensions(self):
+        """Retorna {id_em_minúsculas: versão} das extensões instaladas, ou None em caso de erro."""
+        result = self.ctx.run("code --list-extensions --show-versions")
+        if not result.ok:
+            return None
+
+        installed = {}
+        for line in result.stdout.splitlines():
+            extension_id, _, version = line.strip().partition('@')
+            if extension_id:
+                installed[extension_id.lower()] = version
+        return installed
+
+    def diff_extensions(self, extensions, installed):
+        """Separa as extensões desejadas em (faltando, desatualizadas, em dia)."""
+        to_install, outdated, unchanged = [], [], []
+        for extension in extensions:
+            extension_id, _, version = extension.partition('@')
+            current = installed.get(extension_id.lower())
+            if current is None:
+                to_install.append(extension)
+            elif version and version != current:
+                outdated.append(extension)
+            else:
+                unchanged.append(extension)
+        return to_install, outdated, unchanged
+
     def load_json_file(self, file_path):
         """Carrega um arquivo JSON, removendo comentários se necessário."""
         if file_path.exists():
@@ -0,0 +1,223 @@
+# pilot/src/workspace.py
+import os
+import re
+import time
+import fnmatch
+import tomllib
+import posixpath
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pilot.base.manager import BaseManager
+from pilot.default.workspace import WORKSPACE_DEFAULTS
+from pilot.src.git import GitManager
+from pilot.src.project_index import ProjectIndex
+
+# Nome no início de um requirement PEP 508 (ex.: "pkg-a[extra]>=1.0; python_version<'3.12'")
+REQUIREMENT_NAME = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)')
+
+
+def normalize_name(name):
+    """Nome normalizado segundo a PEP 503 (ex.: 'My_Pkg' -> 'my-pkg')."""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+class WorkspacePackage:
+    def __init__(self, name, path, relative_path, dependencies=()):
+        self.name = name
+        self.path = path
+        self.relative_path = relative_path
+        self.dependencies = set(dependencies)
+
+
+def run_package_action(action, package_path):
+    """
+    Executa a ação num processo novo, dentro do diretório do pacote.
+
+    Roda no pool de processos: os singletons (Config, Context...) são criados
+    do zero para cada pacote, então cada um enxerga o próprio pyproject.toml.
+    """
+    os.chdir(package_path)
+    start = time.perf_counter()
+    try:
+        if action == 'build':
+            from pilot.src.build import BuildManager
+            build_manager = BuildManager()
+            artifacts = build_manager.build(package_path)
+            ok = bool(artifacts)
+            detail = ', '.join(Path(artifact).name for artifact in artifacts) if ok else (build_manager.error or '')
+        elif action == 'publish':
+            from pilot.src.publish import PublishManager
+            ok = bool(PublishManager(package_path).publish_package())
+            detail = ''
+        else:
+            raise ValueError(f"Ação '{action}' não suportada no workspace.")
+    except Exception as e:
+        ok, detail = False, str(e)
+    return ok, time.perf_counter() - start, detail
+
+
+class WorkspaceManager(BaseManager):
+    """
+    Modo monorepo: descobre os pacotes Python do repositório e executa build ou
+    publish só nos afetados desde a última release (e nos que dependem deles).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.section_name = 'workspace'
+        self.default_section = 'default_workspace'
+        self.defaults = WORKSPACE_DEFAULTS
+        self.git_manager = GitManager()
+        self.repo_root = self.git_manager.encontra_repo_git(Path(os.getcwd())) or Path(self.project_root)
+
+    def init(self, **kwargs):
+        self.init_section(WORKSPACE_DEFAULTS, **kwargs)
+
+        self.save_config()
+
+    def update(self, **kwargs):
+        raise NotImplementedError
+
+    def discover_packages(self):
+        """Pacotes do workspace (todo pyproject.toml com [project].name), por nome normalizado."""
+        globs = self.settings.getlist('packages')
+        index = ProjectIndex.for_root(self.repo_root)
+        packages = {}
+        for relative_file in index.files:
+            if posixpath.basename(relative_file) != 'pyproject.toml':
+                continue
+            relative_dir = posixpath.dirname(relative_file) or '.'
+            if globs and not any(fnmatch.fnmatch(relative_dir, pattern) for pattern in globs):
+                continue
+            try:
+                with open(self.repo_root / relative_file, 'rb') as f:
+                    project = tomllib.load(f).get('project', {})
+            except (OSError, tomllib.TOMLDecodeError) as e:
+                self.log.warning(f"Ignorando {relative_file}: {e}")
+                continue
+            if not project.get('name'):
+                continue  # pyproject.toml sem [project] (ex.: raiz do monorepo)
+
+            dependencies = {
+                normalize_name(match.group(1))
+                for requirement in project.get('dependencies', [])
+                if (match := REQUIREMENT_NAME.match(requirement))
+            }
+            name = normalize_name(project['name'])
+            packages[name] = WorkspacePackage(name, self.repo_root / relative_dir, relative_dir, dependencies)
+
+        # Só interessam as dependências entre pacotes do próprio workspace
+        for package in packages.values():
+            package.dependencies &= packages.keys()
+        return packages
+
+    def base_ref(self):
+        """Referência do diff: `base_ref` configurado ou a última tag de release."""
+        return self.settings.get('base_ref') or self.git_manager.ultima_tag_semantica()
+
+    def changed_files(self, base_ref):
+        """Arquivos alterados desde `base_ref` (commits e working tree) mais os não rastreados."""
+        diff = self.ctx.run(['git', '-C', str(self.repo_root), 'diff', '--name-only', '-z', base_ref, '--'])
+        if not diff.ok:
+            raise RuntimeError(f"git diff contra '{base_ref}' falhou: {diff.stderr}")
+        untracked = self.ctx.run(
+            ['git', '-C', str(self.repo_root), 'ls-files', '--others', '--exclude-standard', '-z']
+        )
+        if not untracked.ok:
+            raise RuntimeError(f"git ls-files falhou: {untracked.stderr}")
+        return {path for path in (diff.stdout + '\0' + untracked.stdout).split('\0') if path}
+
+    @staticmethod
+    def owner_of(path, packages):
+        """Pacote mais interno que contém o arquivo (ou None)."""
+        owner = None
+        for package in packages.values():
+            prefix = '' if package.relative_path == '.' else package.relative_path + '/'
+            if path.startswith(prefix) and (owner is None or len(prefix) > len(owner.relative_path)):
+                owner = package
+        return owner
+
+    @staticmethod
+    def with_dependents(names, packages):
+        """Inclui, transitivamente, os pacotes que dependem dos pacotes em `names`."""
+        dependents = {name: set() for name in packages}
+        for package in packages.values():
+            for dependency in package.dependencies:
+                dependents[dependency].add(package.name)
+
+        affected, pending = set(names), list(names)
+        while pending:
+            for dependent in dependents[pending.pop()]:
+                if dependent not in affected:
+                    affected.add(dependent)
+                    pending.append(dependent)
+        return affected
+
+    def affected_packages(self, packages, base_ref=None):
+        """Nomes dos pacotes afetados desde `base_ref`; sem referência, todos."""
+        base_ref = base_ref or self.base_ref()
+        if not base_ref:
+            self.log.warning("Nenhuma tag de release encontrada: todos os pacotes serão processados.")
+            return set(packages)
+
+        changed = set()
+        for path in self.changed_files(base_ref):
+            owner = self.owner_of(path, packages)
+            if owner:
+                changed.add(owner.name)
+        self.log.info(f"{len(changed)} pacote(s) alterado(s) desde {base_ref}.")
+        return self.with_dependents(changed, packages)
+
+    def run(self, action, base_ref=None, all_packages=False, max_workers=None):
+        """Executa `action` ('build' ou 'publish') nos pacotes afetados e imprime a tabela de resultados."""
+        packages = self.discover_packages()
+        selected = set(packages) if all_packages else self.affected_packages(packages, base_ref)
+        if not selected:
+            self.log.info("Nenhum pacote afetado. Nada a fazer.")
+            return {}
+
+        max_workers = max_workers or self.settings.getint('max_workers')
+        self.log.info(f"Executando '{action}' em {len(selected)} pacote(s) com {max_workers} processo(s)...")
+        results = {}
+        # spawn + um pacote por processo: nenhum estado (singletons, cwd) vaza entre pacotes
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            max_tasks_per_child=1,
+        ) as executor:
+            futures = {
+                executor.submit(run_package_action, action, str(packages[name].path)): name
+                for name in sorted(selected)
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = (False, 0.0, str(e))
+                self.log.info(f"{name}: {'ok' if results[name][0] else 'falhou'}")
+
+        self.print_results(action, packages, results)
+        return results
+
+    def print_results(self, action, packages, results):
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title=f"Workspace: {action}")
+        table.add_column("Pacote")
+        table.add_column("Caminho")
+        table.add_column("Resultado")
+        table.add_column("Tempo (s)", justify="right")
+        table.add_column("Detalhe")
+        for name, (ok, elapsed, detail) in sorted(results.items()):
+            table.add_row(
+                name,
+                packages[name].relative_path,
+                "[green]ok[/green]" if ok else "[red]falhou[/red]",
+                f"{elapsed:.2f}",
+                detail[:80],
+            )
+        Console().print(table)
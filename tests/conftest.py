@@ -0,0 +1,53 @@
+# tests/conftest.py
+import os
+import sys
+import json
+
+import pytest
+
+from pilot.singleton import Singleton
+
+
+@pytest.fixture(autouse=True)
+def project(tmp_path, monkeypatch):
+    """Projeto vazio com pilot.conf próprio, cache isolado e singletons recriados a cada teste."""
+    project = tmp_path / 'project'
+    project.mkdir()
+    (project / 'pilot.conf').write_text('', encoding='utf-8')
+    monkeypatch.chdir(project)
+    monkeypatch.setenv('PILOT_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setenv('PILOT_USER_CONFIG', str(tmp_path / 'user.conf'))
+    for name in list(os.environ):
+        if name.startswith('PILOT_') and '__' in name:
+            monkeypatch.delenv(name)
+
+    Singleton._instances.clear()
+    yield project
+    Singleton._instances.clear()
+
+
+FAKE_DOCKER = '''#!{python}
+import json, os, sys
+with open({log!r}, 'a') as f:
+    f.write(json.dumps({{'argv': sys.argv[1:], 'url': os.environ.get('CODEARTIFACT_REPOSITORY_URL')}}) + '\\n')
+# Nenhum builder existe até ser criado
+sys.exit(1 if sys.argv[-2:-1] == ['inspect'] else 0)
+'''
+
+
+@pytest.fixture
+def docker_calls(tmp_path, monkeypatch):
+    """`docker` falso no PATH; retorna a função que lista as chamadas (argv e URL do CodeArtifact)."""
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    log = tmp_path / 'docker.log'
+    script = bin_dir / 'docker'
+    script.write_text(FAKE_DOCKER.format(python=sys.executable, log=str(log)), encoding='utf-8')
+    script.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    def calls():
+        if not log.exists():
+            return []
+        return [json.loads(line) for line in log.read_text(encoding='utf-8').splitlines()]
+    return calls
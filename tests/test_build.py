@@ -0,0 +1,75 @@
+# tests/test_build.py
+import os
+import subprocess
+import time
+
+from pilot.src.build import BuildManager, INCOMPLETE_ENTRY_MAX_AGE
+from pilot.src.cache import get_cache_dir
+
+
+def cache_entries():
+    return sorted(path.name for path in get_cache_dir('builds').iterdir() if path.is_dir())
+
+
+def test_cache_miss_does_not_create_an_entry(project):
+    manager = BuildManager()
+
+    assert manager.cached_artifacts('a' * 64) is None
+    assert cache_entries() == []
+
+
+def test_store_and_restore_round_trip(project):
+    manager = BuildManager()
+    artifact = project / 'pkg-1.0.tar.gz'
+    artifact.write_bytes(b'sdist')
+
+    manager.store_artifacts('b' * 64, [artifact])
+    cached = manager.cached_artifacts('b' * 64)
+    restored = manager.restore_artifacts(cached, project)
+
+    assert [path.read_bytes() for path in restored] == [b'sdist']
+    assert restored[0].parent == project / 'dist'
+
+
+def test_prune_drops_stale_incomplete_entries(project):
+    manager = BuildManager()
+    stale = get_cache_dir('builds') / ('c' * 32)
+    stale.mkdir()
+    old = time.time() - INCOMPLETE_ENTRY_MAX_AGE - 60
+    os.utime(stale, (old, old))
+    fresh = get_cache_dir('builds') / ('d' * 32)
+    fresh.mkdir()  # Pode ser uma gravação em andamento de outro processo
+
+    manager._prune_cache(keep=5)
+
+    assert cache_entries() == ['d' * 32]
+
+
+def test_fingerprint_ignores_tracked_files_deleted_from_the_worktree(project, monkeypatch):
+    git = lambda *args: subprocess.run(['git', '-C', str(project), *args], check=True, capture_output=True)
+    git('init', '-q')
+    git('config', 'user.email', 'ci@example.com')
+    git('config', 'user.name', 'ci')
+    (project / 'a.py').write_text('a = 1\n')
+    (project / 'b.py').write_text('b = 1\n')
+    git('add', '-A')
+    git('commit', '-qm', 'init')
+    (project / 'b.py').unlink()
+    manager = BuildManager()
+    monkeypatch.setattr(manager, 'resolve_version', lambda path: '1.0')
+
+    fingerprint = manager.build_fingerprint(str(project))
+
+    assert fingerprint == manager.build_fingerprint(str(project))
+
+
+def test_file_artifacts_only_match_at_the_build_root(project):
+    for path in ('setup.py', 'requirements.txt', 'docs/requirements.txt', 'scripts/setup.py',
+                 'dist/app.whl', 'pkg/app.egg-info/PKG-INFO'):
+        (project / path).parent.mkdir(parents=True, exist_ok=True)
+        (project / path).write_text('')
+
+    artifacts = BuildManager().find_build_artifacts(str(project))
+
+    relative = sorted(path.relative_to(project.resolve()).as_posix() for path in artifacts)
+    assert relative == ['dist', 'pkg/app.egg-info', 'requirements.txt', 'setup.py']
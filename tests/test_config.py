@@ -0,0 +1,48 @@
+# tests/test_config.py
+import configparser
+
+from pilot.src.build import BuildManager
+from pilot.src.config import Config
+from pilot.src.publish import PublishManager
+
+
+def read_project_config(project):
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(project / 'pilot.conf', encoding='utf-8')
+    return parser
+
+
+def test_init_does_not_copy_user_and_env_layers_into_project(project, tmp_path, monkeypatch):
+    (tmp_path / 'user.conf').write_text('[publish]\nusername = alice\n', encoding='utf-8')
+    monkeypatch.setenv('PILOT_BUILD__CACHE', 'false')
+
+    BuildManager().init()
+    PublishManager(str(project)).init()
+    assert Config().flush()
+
+    written = read_project_config(project)
+    assert not written.has_option('build', 'cache')
+    assert not written.has_option('publish', 'username')
+    assert written.get('build', 'clean_workers') == '4'  # Default ausente em todas as camadas
+    assert BuildManager().settings.getboolean('cache') is False
+
+
+def test_init_writes_explicit_values(project, monkeypatch):
+    monkeypatch.setenv('PILOT_BUILD__CACHE', 'false')
+
+    BuildManager().init(cache='true', cache_keep='9')
+    Config().flush()
+
+    written = read_project_config(project)
+    assert written.get('build', 'cache') == 'true'
+    assert written.get('build', 'cache_keep') == '9'
+
+
+def test_percent_signs_in_project_and_env_values_are_literal(project, monkeypatch):
+    (project / 'pilot.conf').write_text('[publish]\nindex_url = http://h/simple/a%2Bb/\n', encoding='utf-8')
+    monkeypatch.setenv('PILOT_PUBLISH__USERNAME', 'p%40ss')
+
+    settings = PublishManager(str(project)).settings
+
+    assert settings.get('index_url') == 'http://h/simple/a%2Bb/'
+    assert settings.get('username') == 'p%40ss'
@@ -0,0 +1,105 @@
+# tests/test_context.py
+import os
+import asyncio
+import sys
+import time
+import shlex
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pilot.src.context import Context, MAX_RECORD_SIZE, STOP_STREAM
+
+SLEEP = [sys.executable, '-c', 'import time; time.sleep(0.5)']
+
+
+def test_max_concurrency_limits_commands_from_threads(project):
+    (project / 'pilot.conf').write_text('[context]\nmax_concurrency = 1\n', encoding='utf-8')
+    ctx = Context()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: ctx.run(SLEEP), range(4)))
+
+    assert all(result.ok for result in results)
+    assert time.perf_counter() - start >= 2.0
+
+
+def test_run_all_shares_the_same_limit(project):
+    (project / 'pilot.conf').write_text('[context]\nmax_concurrency = 2\n', encoding='utf-8')
+    ctx = Context()
+
+    start = time.perf_counter()
+    results = ctx.run_all([SLEEP] * 4)
+
+    assert all(result.ok for result in results)
+    assert 1.0 <= time.perf_counter() - start < 2.0
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='grupo de processos POSIX')
+def test_timeout_kills_the_whole_shell_pipeline(project):
+    pid_file = project / 'child.pid'
+    code = f"import os, time; open({str(pid_file)!r}, 'w').write(str(os.getpid())); time.sleep(30)"
+    ctx = Context()
+
+    start = time.perf_counter()
+    result = ctx.run(f'{shlex.quote(sys.executable)} -c {shlex.quote(code)} | cat', timeout=1)
+
+    assert not result.ok
+    assert time.perf_counter() - start < 10
+    child = int(pid_file.read_text())
+    time.sleep(0.2)
+    assert not _alive(child)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f'/proc/{pid}/status', encoding='utf-8') as f:
+            return not any(line.startswith('State:') and 'Z' in line for line in f)
+    except OSError:
+        return True
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='watcher de processos filhos do asyncio (POSIX)')
+def test_stop_stream_does_not_race_the_child_watcher(project, capfd, caplog):
+    # O printf termina antes do STOP_STREAM ser tratado: matar via `Popen.poll`
+    # coletaria o filho antes do watcher do asyncio ("Unknown child process pid")
+    ctx = Context()
+
+    for _ in range(30):
+        result = ctx.run(['printf', 'a\\nb\\nc\\n'], stream=True, on_line=lambda line, name: STOP_STREAM)
+        assert result.stopped and result.ok
+
+    assert capfd.readouterr().err == ''
+    assert not [record for record in caplog.records if record.name == 'asyncio']
+
+
+def stream_records(*chunks, separator='\n'):
+    async def collect():
+        reader = asyncio.StreamReader()
+        for chunk in chunks:
+            reader.feed_data(chunk)
+        reader.feed_eof()
+        records = []
+        await Context()._stream_lines(
+            reader, 'stdout', lambda line, name: records.append(line), {'stdout': 0}, separator
+        )
+        return records
+    return asyncio.run(collect())
+
+
+def test_stream_splits_carriage_return_progress_and_crlf():
+    assert stream_records(b'10%\r50%\r100%\nok\r', b'\nfim') == ['10%', '50%', '100%', 'ok', 'fim']
+
+
+def test_stream_flushes_records_longer_than_the_limit():
+    records = stream_records(b'x' * (MAX_RECORD_SIZE * 3 + 10) + b'\ny\n')
+    assert [len(record) for record in records] == [MAX_RECORD_SIZE] * 3 + [10, 1]
+
+
+def test_stream_custom_separator_keeps_newlines():
+    assert stream_records(b'a\nb\0c', b'\0', separator='\0') == ['a\nb', 'c']
@@ -0,0 +1,87 @@
+# tests/test_deploy.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pilot.src.deploy import RemoteDockerDeployPipeline
+from pilot.src.docker import DockerManager
+
+
+class FakeDockerManager:
+    def __init__(self, images):
+        self.images = images
+
+    def image_id(self, image_name, version):
+        return self.images.get(f"{image_name}:{version}")
+
+
+def pipeline_with_images(images):
+    pipeline = RemoteDockerDeployPipeline()
+    pipeline.docker_manager = FakeDockerManager(images)
+    return pipeline
+
+
+def test_build_checkpoint_requires_the_same_image_id(project):
+    pipeline = pipeline_with_images({'app:1.0': 'sha256:aaa'})
+
+    assert pipeline.image_exists('app', '1.0', 'sha256:aaa')
+    assert not pipeline.image_exists('app', '1.0', 'sha256:bbb')  # Retag/rebuild depois do checkpoint
+    assert not pipeline.image_exists('app', '2.0', 'sha256:aaa')  # Tag removida
+
+
+def test_checkpoint_without_image_id_is_rebuilt(project):
+    # Checkpoints gravados antes do image_id não são reaproveitados
+    pipeline = pipeline_with_images({'app:1.0': 'sha256:aaa'})
+    assert not pipeline.image_exists('app', '1.0')
+
+
+class BuildingDockerManager(FakeDockerManager):
+    """Registra quantos builds rodam ao mesmo tempo em cada contexto."""
+
+    def __init__(self, docker_context, active, overlaps):
+        super().__init__({})
+        self.docker_context = docker_context
+        self.active = active
+        self.overlaps = overlaps
+        self.build_lock = DockerManager(docker_context).build_lock
+
+    def calcular_digest_build(self, path, version):
+        return 'digest'
+
+    def imagem_com_digest(self, image_name, version, digest):
+        return False
+
+    def verificar_existencia_imagem(self, image_name, version):
+        return f"{image_name}:{version}" in self.images
+
+    def remover_imagem(self, image_name, version):
+        self.images.pop(f"{image_name}:{version}", None)
+
+    def build_docker_image(self, path, image_name, version, url, **options):
+        self.active[self.docker_context] += 1
+        self.overlaps.append(self.active[self.docker_context])
+        time.sleep(0.05)
+        self.images[f"{image_name}:{version}"] = f"sha256:{threading.get_ident()}"
+        self.active[self.docker_context] -= 1
+
+
+def test_targets_on_the_same_context_build_one_at_a_time(project):
+    (project / 'pilot.conf').write_text('[publish]\npackage_name = app\n')
+    active, overlaps, images = {'shared': 0}, [], {}
+    pipelines = []
+    for _ in range(3):
+        pipeline = RemoteDockerDeployPipeline()
+        pipeline.docker_manager = BuildingDockerManager('shared', active, overlaps)
+        pipeline.docker_manager.images = images  # Mesmo daemon: as tags são compartilhadas
+        pipelines.append(pipeline)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(lambda p: p.step_build_image('shared', 'url', '1.0'), pipelines))
+
+    assert overlaps == [1, 1, 1]
+    assert all(result['image_id'] for result in results)
+
+
+def test_build_lock_is_shared_per_context(project):
+    assert DockerManager('remote').build_lock() is DockerManager('remote').build_lock()
+    assert DockerManager('remote').build_lock() is not DockerManager('other').build_lock()
@@ -0,0 +1,37 @@
+# tests/test_digest.py
+import os
+
+import pytest
+
+from pilot.src.digest import build_context_files, hash_build_context, is_ignored
+
+
+@pytest.mark.parametrize('path, patterns, ignored', [
+    ('app.log', ['*.log'], True),
+    ('src/app.log', ['*.log'], False),  # `*` não atravessa '/'
+    ('src/app.log', ['*/*.log'], True),
+    ('src/deep/app.log', ['**/*.log'], True),
+    ('app.log', ['**/*.log'], True),
+    ('build/lib/x.py', ['build'], True),  # Diretório ignorado leva o conteúdo junto
+    ('rebuild/x.py', ['build'], False),
+    ('docs/a.md', ['docs', '!docs/a.md'], False),
+    ('docs/b.md', ['docs', '!docs/a.md'], True),
+    ('data/x.csv', ['/data/'], True),
+    ('data/x.csv', ['./data'], True),
+    ('a/b/c.txt', ['a/**/c.txt'], True),
+    ('a/c.txt', ['a/**/c.txt'], True),
+    ('a/b/c.txt', ['a?b'], False),
+])
+def test_dockerignore_matching_follows_docker(path, patterns, ignored):
+    assert is_ignored(path, patterns) is ignored
+
+
+def test_missing_dockerfile_and_dangling_symlink_are_skipped(project):
+    (project / 'app.py').write_text('print(1)\n')
+    os.symlink(project / 'missing.txt', project / 'broken-link')
+
+    assert sorted(build_context_files(project)) == ['app.py', 'pilot.conf']
+    first = hash_build_context(project, extra=('1.0',))
+
+    (project / 'Dockerfile').write_text('FROM python:3.11\n')
+    assert hash_build_context(project, extra=('1.0',)) != first
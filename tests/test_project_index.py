@@ -0,0 +1,27 @@
+# tests/test_project_index.py
+import subprocess
+
+from pilot.src.project_index import ProjectIndex
+
+
+def git(root, *args):
+    subprocess.run(['git', '-C', str(root), *args], check=True, capture_output=True)
+
+
+def test_git_index_skips_files_deleted_from_the_worktree(project):
+    git(project, 'init', '-q')
+    git(project, 'config', 'user.email', 'ci@example.com')
+    git(project, 'config', 'user.name', 'ci')
+    (project / 'app').mkdir()
+    (project / 'app' / 'main.py').write_text('print(1)\n')
+    (project / 'old').mkdir()
+    (project / 'old' / 'main.py').write_text('print(0)\n')
+    git(project, 'add', '-A')
+    git(project, 'commit', '-qm', 'init')
+    (project / 'old' / 'main.py').unlink()
+
+    index = ProjectIndex(project)
+
+    assert 'old/main.py' not in index.files
+    assert index.find_first('main.py') == index.root / 'app' / 'main.py'
+    assert index.glob('*.py') == [index.root / 'app' / 'main.py']
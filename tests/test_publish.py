@@ -0,0 +1,83 @@
+# tests/test_publish.py
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pilot.src.publish import PublishManager
+
+SIMPLE_PAGE = b'''<!DOCTYPE html><html><body>
+<a href="../../packages/my_pkg-1.0%2Bdirty.tar.gz#sha256=abc">my_pkg-1.0+dirty.tar.gz</a>
+<a href="/packages/my_pkg-1.0-py3-none-any.whl">my_pkg-1.0-py3-none-any.whl</a>
+</body></html>'''
+
+
+@pytest.fixture
+def simple_index():
+    """Índice simple (PEP 503) descartável, com o projeto 'my-pkg' e registro das requisições."""
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append((self.path, self.headers.get('Authorization')))
+            if self.path == '/simple/my-pkg/':
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html')
+                self.end_headers()
+                self.wfile.write(SIMPLE_PAGE)
+            else:
+                self.send_error(404)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/", requests
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def manager(project, simple_index):
+    url, _ = simple_index
+    (project / 'pilot.conf').write_text(f"[publish]\nrepository_url = {url}\nusername = ci\n", encoding='utf-8')
+    (project / 'pyproject.toml').write_text('[project]\nname = "My_Pkg"\n', encoding='utf-8')
+    return PublishManager(str(project))
+
+
+def test_published_files_are_url_decoded(manager, simple_index):
+    url, requests = simple_index
+
+    files = manager.published_files(f"{url}simple/", 'My_Pkg', 'ci', 'secret')
+
+    assert files == {'my_pkg-1.0+dirty.tar.gz', 'my_pkg-1.0-py3-none-any.whl'}
+    assert requests[0][0] == '/simple/my-pkg/'
+    assert requests[0][1].startswith('Basic ')
+
+
+def test_unknown_project_has_no_files(manager, simple_index):
+    url, _ = simple_index
+    assert manager.published_files(f"{url}simple/", 'other') == set()
+
+
+def test_publish_uploads_only_missing_artifacts(manager, project, simple_index, monkeypatch):
+    _, requests = simple_index
+    dist = project / 'dist'
+    dist.mkdir()
+    artifacts = [str(dist / name) for name in (
+        'my_pkg-1.0+dirty.tar.gz', 'my_pkg-1.0-py3-none-any.whl', 'my_pkg-1.1-py3-none-any.whl',
+    )]
+    uploaded = []
+    monkeypatch.setattr(manager.build_manager, 'build', lambda path: artifacts)
+    monkeypatch.setattr(manager, 'upload_file', lambda path, *args: uploaded.append(path) or 0.0)
+
+    assert manager.publish_package()
+    assert uploaded == [artifacts[2]]
+
+    # Segundo ciclo: índice em cache, já atualizado com o upload anterior
+    uploaded.clear()
+    assert manager.publish_package()
+    assert uploaded == []
+    assert len(requests) == 1
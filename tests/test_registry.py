@@ -0,0 +1,100 @@
+# tests/test_registry.py
+import os
+import json
+import base64
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+
+import pytest
+
+from pilot.src.docker import DockerManager
+from pilot.src.registry import RegistryClient
+
+MEDIA_TYPE = 'application/vnd.docker.distribution.manifest.v2+json'
+MANIFEST = json.dumps({'schemaVersion': 2, 'mediaType': MEDIA_TYPE, 'layers': []}).encode('utf-8')
+CREDENTIALS = 'Basic ' + base64.b64encode(b'AWS:secret').decode('ascii')
+
+
+@pytest.fixture
+def registry():
+    """Stand-in do registry:2 (API v2 de manifests) com autenticação Basic obrigatória."""
+    manifests = {('app', '1.0'): (MANIFEST, MEDIA_TYPE)}
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def _authorized(self):
+            requests.append((self.command, self.path))
+            if self.headers.get('Authorization') == CREDENTIALS:
+                return True
+            self.send_response(401)
+            self.send_header('WWW-Authenticate', 'Basic realm="registry"')
+            self.end_headers()
+            return False
+
+        def _reference(self):
+            _, _, repository, _, reference = self.path.split('/', 4)
+            return repository, reference
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            if MEDIA_TYPE not in self.headers.get('Accept', ''):
+                self.send_error(406)
+                return
+            manifest = manifests.get(self._reference())
+            if manifest is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', manifest[1])
+            self.end_headers()
+            self.wfile.write(manifest[0])
+
+        def do_PUT(self):
+            if not self._authorized():
+                return
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            manifests[self._reference()] = (body, self.headers['Content-Type'])
+            self.send_response(201)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"127.0.0.1:{server.server_port}", manifests, requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_retag_copies_the_manifest_with_its_media_type(registry):
+    host, manifests, requests = registry
+
+    RegistryClient(host, username='AWS', password='secret').retag('app', '1.0', 'latest')
+
+    assert manifests[('app', 'latest')] == (MANIFEST, MEDIA_TYPE)
+    assert requests == [('GET', '/v2/app/manifests/1.0'), ('PUT', '/v2/app/manifests/latest')]
+
+
+def test_wrong_credentials_are_rejected(registry):
+    host, manifests, _ = registry
+
+    with pytest.raises(HTTPError) as error:
+        RegistryClient(host, username='AWS', password='wrong').retag('app', '1.0', 'latest')
+
+    assert error.value.code == 401
+    assert ('app', 'latest') not in manifests
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='docker falso em script Python com shebang')
+def test_manifest_strategy_pushes_once_and_tags_in_the_registry(registry, docker_calls):
+    host, manifests, _ = registry
+    client = RegistryClient(host, username='AWS', password='secret')
+
+    timings = DockerManager().push_images(f"{host}/app", ['1.0', 'latest', 'stable', '1.0'], registry_client=client)
+
+    assert [call['argv'] for call in docker_calls()] == [['push', f"{host}/app:1.0"]]
+    assert set(timings) == {'1.0', 'latest', 'stable'}
+    assert manifests[('app', 'latest')] == manifests[('app', 'stable')] == (MANIFEST, MEDIA_TYPE)
@@ -0,0 +1,124 @@
+# tests/test_scheduler.py
+import time
+import threading
+
+import pytest
+
+from pilot.base.scheduler import PipelineError, Step, StepScheduler
+from pilot.src.checkpoint import CheckpointStore
+
+
+class Recorder:
+    """Registra início/fim de cada etapa e o pico de etapas simultâneas."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started, self.finished = {}, {}
+        self.running = self.peak = 0
+
+    def step(self, name, result=None, delay=0.1, error=None):
+        def run(**inputs):
+            with self.lock:
+                self.started[name] = time.perf_counter()
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            try:
+                time.sleep(delay)
+                if error:
+                    raise error
+                return result
+            finally:
+                with self.lock:
+                    self.running -= 1
+                    self.finished[name] = time.perf_counter()
+        return run
+
+
+def test_steps_run_after_their_inputs_and_independent_ones_overlap():
+    rec = Recorder()
+    steps = [
+        Step('deploy', rec.step('deploy', 'ok'), inputs=['image', 'token'], outputs=['result']),
+        Step('build', rec.step('build', 'img:1'), outputs=['image']),
+        Step('login', rec.step('login', 'tok'), outputs=['token']),
+    ]
+
+    values = StepScheduler(steps, max_workers=4).run()
+
+    assert values == {'image': 'img:1', 'token': 'tok', 'result': 'ok'}
+    assert rec.started['deploy'] >= max(rec.finished['build'], rec.finished['login'])
+    assert rec.peak == 2  # build e login em paralelo
+
+
+def test_failure_cancels_dependent_steps():
+    rec = Recorder()
+    steps = [
+        Step('build', rec.step('build', error=RuntimeError('docker caiu')), outputs=['image']),
+        Step('slow', rec.step('slow', 'x', delay=0.3), outputs=['other']),
+        Step('push', rec.step('push'), inputs=['image']),
+    ]
+    scheduler = StepScheduler(steps, max_workers=4)
+
+    with pytest.raises(PipelineError) as error:
+        scheduler.run()
+
+    assert error.value.step_name == 'build'
+    assert 'docker caiu' in str(error.value)
+    assert 'push' not in rec.started
+    assert scheduler.timings['push'].status == 'cancelada'
+    assert scheduler.timings['build'].status == 'erro'
+
+
+def test_failure_waits_for_running_steps_up_to_the_timeout():
+    rec = Recorder()
+    steps = [
+        Step('build', rec.step('build', error=RuntimeError('docker caiu'), delay=0), outputs=['image']),
+        Step('login', rec.step('login', 'tok', delay=0.2), outputs=['token']),
+    ]
+
+    with pytest.raises(PipelineError):
+        StepScheduler(steps, max_workers=4).run()
+    assert 'login' in rec.finished  # Não fica rodando depois do erro
+
+    rec = Recorder()
+    steps[1] = Step('login', rec.step('login', 'tok', delay=0.5), outputs=['token'])
+    scheduler = StepScheduler(steps, max_workers=4, shutdown_timeout=0.05)
+    with pytest.raises(PipelineError):
+        scheduler.run()
+    assert 'login' not in rec.finished
+    assert scheduler.timings['login'].status == 'executando'
+
+
+def test_max_workers_is_respected():
+    rec = Recorder()
+    steps = [Step(f"s{i}", rec.step(f"s{i}", i), outputs=[f"o{i}"]) for i in range(6)]
+
+    StepScheduler(steps, max_workers=2).run()
+
+    assert rec.peak == 2
+    assert len(rec.finished) == 6
+
+
+def test_graph_errors_are_reported_before_running():
+    with pytest.raises(PipelineError, match='Entradas sem produtor: missing'):
+        StepScheduler([Step('a', lambda missing: 1, inputs=['missing'], outputs=['x'])]).run()
+    with pytest.raises(PipelineError, match='circular'):
+        StepScheduler([
+            Step('a', lambda y: 1, inputs=['y'], outputs=['x']),
+            Step('b', lambda x: 1, inputs=['x'], outputs=['y']),
+        ]).run()
+
+
+def test_resume_skips_valid_checkpoints(tmp_path):
+    checkpoints = CheckpointStore({'pipeline': 'teste'}, cache_dir=tmp_path)
+    calls = []
+    steps = lambda valid: [
+        Step('build', lambda: calls.append('build') or 'img', outputs=['image'],
+             checkpoint=True, validate=lambda image: valid),
+        Step('push', lambda image: calls.append('push'), inputs=['image']),
+    ]
+
+    StepScheduler(steps(True)).run(checkpoints=checkpoints)
+    StepScheduler(steps(True)).run(checkpoints=checkpoints, resume=True)
+    StepScheduler(steps(False)).run(checkpoints=checkpoints, resume=True)
+
+    assert calls == ['build', 'push', 'push', 'build', 'push']
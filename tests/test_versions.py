@@ -0,0 +1,21 @@
+# tests/test_versions.py
+from pilot.src.versions import excluded_versions, latest_version
+
+SCM_VERSIONS = ['1.2.0', '1.2.1.dev3', '1.2.0.post2+dirty', '1.10.0rc1', 'not-a-version']
+
+
+def test_latest_uses_pep440_ordering():
+    assert latest_version(['1.9.0', '1.10.0', '1.10.0.post1', '1.2.0']) == '1.10.0.post1'
+
+
+def test_prereleases_and_local_versions_are_opt_in():
+    assert latest_version(SCM_VERSIONS) == '1.2.0'
+    assert latest_version(SCM_VERSIONS, allow_local=True) == '1.2.0.post2+dirty'
+    assert latest_version(SCM_VERSIONS, allow_prereleases=True) == '1.10.0rc1'
+
+
+def test_excluded_versions_explains_the_filters():
+    assert excluded_versions(SCM_VERSIONS) == {'pré-release/dev': 2, 'local': 1, 'inválida': 1}
+    assert excluded_versions(SCM_VERSIONS, allow_prereleases=True, allow_local=True) == {
+        'pré-release/dev': 0, 'local': 0, 'inválida': 1,
+    }
@@ -0,0 +1,49 @@
+# tests/test_workspace.py
+import subprocess
+
+import pytest
+
+from pilot.src.workspace import WorkspaceManager, run_package_action
+
+
+def write_package(root, relative_dir, name, dependencies=()):
+    package = root / relative_dir
+    package.mkdir(parents=True)
+    deps = ', '.join(f'"{dependency}"' for dependency in dependencies)
+    (package / 'pyproject.toml').write_text(
+        f'[build-system]\nrequires = []\nbuild-backend = "backend_que_nao_existe"\n\n'
+        f'[project]\nname = "{name}"\nversion = "1.0"\ndependencies = [{deps}]\n',
+        encoding='utf-8',
+    )
+    return package
+
+
+@pytest.fixture
+def monorepo(project):
+    git = lambda *args: subprocess.run(['git', '-C', str(project), *args], check=True, capture_output=True)
+    git('init', '-q')
+    git('config', 'user.email', 'ci@example.com')
+    git('config', 'user.name', 'ci')
+    write_package(project, 'libs/core', 'acme-core')
+    write_package(project, 'services/api', 'acme_api', ['acme-core>=1.0'])
+    write_package(project, 'services/worker', 'acme-worker')
+    git('add', '-A')
+    git('commit', '-qm', 'init')
+    git('tag', 'v1.0.0')
+    return project
+
+
+def test_changed_library_selects_its_dependents(monorepo):
+    (monorepo / 'libs/core/module.py').write_text('x = 1\n')  # Não rastreado: também conta
+
+    manager = WorkspaceManager()
+    packages = manager.discover_packages()
+
+    assert manager.affected_packages(packages) == {'acme-core', 'acme-api'}
+
+
+def test_failed_build_reports_the_reason(monorepo):
+    ok, _, detail = run_package_action('build', str(monorepo / 'services/worker'))
+
+    assert not ok
+    assert detail